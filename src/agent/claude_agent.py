@@ -1,17 +1,152 @@
 """Claude Agent implementation using Anthropic SDK."""
 
 import logging
+import re
+import threading
+import time
+from collections.abc import Generator, Iterator
 from typing import Any
 
-from anthropic import Anthropic
-from anthropic.types import TextBlock, ToolUseBlock
+import httpx
+from anthropic import Anthropic, DefaultHttpxClient
+from anthropic.types import Message, TextBlock, ToolUseBlock
 
+from src.agent.response_cache import CachedTurn, ResponseCache
 from src.agent.tool_executor import ToolExecutor
 from src.agent.tools import TOOLS
 from src.agent.ui_state import UIState
 
 logger = logging.getLogger(__name__)
 
+# Prompt caching breakpoint (5-minute ephemeral cache)
+CACHE_CONTROL: dict[str, str] = {"type": "ephemeral"}
+
+# Tool schemas with a breakpoint on the last tool, which caches the whole tools block
+CACHED_TOOLS: list[dict[str, Any]] = [dict(tool) for tool in TOOLS]
+CACHED_TOOLS[-1]["cache_control"] = CACHE_CONTROL
+
+# Model used for every request
+MODEL = "claude-haiku-4-5-20251001"
+
+# Purely conversational inputs (greetings, thanks, farewells) answered without tools;
+# anything else may be calculator input or a UI request and takes the full loop
+CONVERSATIONAL_PATTERN = re.compile(
+    r"(hi|hello|hey|thanks|thank you|thx|ok|okay|cool|great|nice|bye|goodbye"
+    r"|good (morning|afternoon|evening|night))"
+    r"(\s+(there|claude|so much|a lot|again))?[\s!.,]*",
+    re.IGNORECASE,
+)
+SIMPLE_MAX_TOKENS = 256
+
+# Conversation history bound; trimming drops whole turns down to half of this
+MAX_HISTORY_MESSAGES = 64
+
+# Greeting returned to newly connected clients
+WELCOME_MESSAGE = "Welcome to Agentic Calculator. I'm Claude, ready to assist."
+
+# Placeholder turn sent by cache-warming requests
+WARM_MESSAGE: dict[str, Any] = {"role": "user", "content": "ping"}
+
+# Connection pool shared by every agent using the same API key
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+
+# Anthropic clients keyed by API key; agents are built in worker threads, so
+# creation is serialized to avoid two threads each making a client
+clients: dict[str, Anthropic] = {}
+clients_lock = threading.Lock()
+
+
+def get_anthropic_client(api_key: str) -> Anthropic:
+    """Get the Anthropic client for an API key, creating it on first use.
+
+    Sharing one client keeps its keep-alive connections warm across sessions,
+    so new agents skip the TCP and TLS handshakes on their first request.
+
+    Args:
+        api_key: Anthropic API key for authentication.
+
+    Returns:
+        Shared Anthropic client.
+    """
+    client = clients.get(api_key)
+    if client is None:
+        with clients_lock:
+            client = clients.get(api_key)
+            if client is None:
+                # Keep the SDK's default timeouts and redirect handling, only widen the pool
+                client = Anthropic(
+                    api_key=api_key, http_client=DefaultHttpxClient(limits=HTTP_LIMITS)
+                )
+                clients[api_key] = client
+    return client
+
+
+def close_anthropic_clients() -> None:
+    """Close all shared Anthropic clients and their connection pools."""
+    with clients_lock:
+        for client in clients.values():
+            client.close()
+        clients.clear()
+
+
+def is_simple_message(user_input: str) -> bool:
+    """Check whether a message can be answered without running the agentic loop.
+
+    Only known conversational phrases qualify. In a calculator the UI is the
+    answer, so anything unrecognized keeps access to the tools.
+
+    Args:
+        user_input: User message to classify.
+
+    Returns:
+        True if the message is a greeting, thanks or similar small talk.
+    """
+    return CONVERSATIONAL_PATTERN.fullmatch(user_input.strip()) is not None
+
+
+def compact_content(blocks: list[dict[str, Any]]) -> str | list[dict[str, Any]]:
+    """Collapse a single text block to plain string content.
+
+    The API accepts a string for text-only messages, which keeps stored history
+    and every later request body smaller.
+
+    Args:
+        blocks: Content blocks of a message.
+
+    Returns:
+        The text if blocks is a single text block, otherwise blocks unchanged.
+    """
+    if len(blocks) == 1 and blocks[0]["type"] == "text":
+        text: str = blocks[0]["text"]
+        return text
+    return blocks
+
+
+def with_cache_breakpoint(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Return a copy of messages with a cache breakpoint on the last content block.
+
+    The conversation history itself is left untouched so that breakpoints don't
+    accumulate across turns (the API allows at most four per request).
+
+    Args:
+        messages: Conversation history to send to Claude.
+
+    Returns:
+        Shallow copy of messages whose final content block carries cache_control.
+    """
+    if not messages:
+        return messages
+
+    last = messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        blocks: list[dict[str, Any]] = [{"type": "text", "text": content}]
+    else:
+        blocks = list(content)
+    blocks[-1] = {**blocks[-1], "cache_control": CACHE_CONTROL}
+
+    return [*messages[:-1], {**last, "content": blocks}]
+
 
 class ClaudeAgent:
     """Agent backed by Claude using the Anthropic SDK.
@@ -19,19 +154,32 @@ class ClaudeAgent:
     Maintains conversation context across multiple messages and handles tool use.
     """
 
-    def __init__(self, system_prompt: str, api_key: str) -> None:
+    def __init__(
+        self,
+        system_prompt: str,
+        api_key: str,
+        response_cache: ResponseCache | None = None,
+    ) -> None:
         """Initialize agent with system prompt and API key.
 
         Args:
             system_prompt: Initial system prompt to guide agent behavior.
             api_key: Anthropic API key for authentication.
+            response_cache: Optional cache of session-opening turns shared across agents.
         """
         self.system_prompt = system_prompt
-        self.client = Anthropic(api_key=api_key)
+        self.system_blocks: list[dict[str, Any]] = [
+            {"type": "text", "text": system_prompt, "cache_control": CACHE_CONTROL}
+        ]
+        self.client = get_anthropic_client(api_key)
         self.conversation_history: list[dict[str, Any]] = []
         self.ui_state = UIState()
         self.tool_executor = ToolExecutor(self.ui_state)
-        logger.info(f"ClaudeAgent initialized with system prompt: {system_prompt}")
+        self.response_cache = response_cache
+        # Turn bookkeeping for cache warming: warm-ups skip busy and long-idle agents
+        self.in_turn = False
+        self.last_active = time.monotonic()
+        logger.info("ClaudeAgent initialized with system prompt: %s", system_prompt)
 
     def process_message(self, user_input: str) -> str:
         """Process user input and return Claude's response.
@@ -44,38 +192,189 @@ class ClaudeAgent:
         Returns:
             Claude's response text.
         """
-        logger.info(f"Processing message: {user_input}")
+        turn = self._process(user_input, stream=False)
+        while True:
+            try:
+                next(turn)
+            except StopIteration as stop:
+                final_response: str = stop.value
+                return final_response
+
+    def process_message_stream(self, user_input: str) -> Iterator[str]:
+        """Process user input, yielding Claude's text as it is generated.
+
+        Text from every iteration of the agentic loop is streamed, so the caller
+        sees output before tool calls in the same response have been parsed.
+
+        Args:
+            user_input: User message to send to Claude.
+
+        Yields:
+            Text deltas from Claude's responses.
+        """
+        yield from self._process(user_input, stream=True)
+
+    def _process(self, user_input: str, stream: bool) -> Generator[str, None, str]:
+        """Run one user turn, marking the agent busy until it ends.
+
+        Args:
+            user_input: User message to send to Claude.
+            stream: Whether to stream responses and yield their text deltas.
+
+        Yields:
+            Text deltas, only when streaming.
+
+        Returns:
+            Claude's final response text.
+        """
+        self.in_turn = True
+        try:
+            final_response: str = yield from self._run_turn(user_input, stream)
+            return final_response
+        finally:
+            self.in_turn = False
+            self.last_active = time.monotonic()
+
+    def _run_turn(self, user_input: str, stream: bool) -> Generator[str, None, str]:
+        """Run one user turn, optionally streaming text deltas.
+
+        Only the first turn of a session is cached: later turns depend on the
+        calculator state built up so far, which the user input alone doesn't capture.
+
+        Args:
+            user_input: User message to send to Claude.
+            stream: Whether to stream responses and yield their text deltas.
+
+        Yields:
+            Text deltas, only when streaming.
+
+        Returns:
+            Claude's final response text.
+        """
+        logger.info("Processing message: %s", user_input)
+
+        cache = None
+        if not self.conversation_history and ResponseCache.is_cacheable(user_input):
+            cache = self.response_cache
+
+        if cache is not None:
+            cached = cache.search(user_input)
+            if cached is not None:
+                final_response = self._replay_turn(user_input, cached)
+                if stream:
+                    yield final_response
+                return final_response
 
         # Add user message to history
+        self._trim_history()
         self.conversation_history.append({"role": "user", "content": user_input})
 
+        if is_simple_message(user_input):
+            final_response = yield from self._process_simple_message(stream)
+        else:
+            final_response = yield from self._run_agentic_loop(stream)
+
+        if cache is not None:
+            cache.put(user_input, CachedTurn(final_response, self.conversation_history[1:]))
+        return final_response
+
+    def _trim_history(self) -> None:
+        """Drop old turns once history exceeds MAX_HISTORY_MESSAGES.
+
+        Only whole turns are removed, so no tool_result is separated from its
+        tool_use. The first turn is kept because it built the UI and holds the
+        element IDs Claude refers to. History is trimmed to half the bound at
+        once, so the cached prompt prefix is invalidated rarely.
+        """
+        history = self.conversation_history
+        if len(history) <= MAX_HISTORY_MESSAGES:
+            return
+
+        # A turn starts with a plain-text user message (tool results are block lists)
+        turn_starts = [
+            index
+            for index, message in enumerate(history)
+            if message["role"] == "user" and isinstance(message["content"], str)
+        ]
+        if len(turn_starts) < 3:
+            return
+
+        first_turn_end = turn_starts[1]
+        keep_from = turn_starts[-1]
+        for start in turn_starts[2:]:
+            if first_turn_end + len(history) - start <= MAX_HISTORY_MESSAGES // 2:
+                keep_from = start
+                break
+
+        logger.info(
+            "Trimming conversation history from message %d to %d", first_turn_end, keep_from
+        )
+        self.conversation_history = history[:first_turn_end] + history[keep_from:]
+
+    def _request(self, stream: bool, **kwargs: Any) -> Generator[str, None, Message]:
+        """Send a request to Claude, optionally streaming its text deltas.
+
+        Args:
+            stream: Whether to stream the response.
+            **kwargs: Arguments for the Messages API.
+
+        Yields:
+            Text deltas, only when streaming.
+
+        Returns:
+            The complete response message.
+        """
+        if not stream:
+            response: Message = self.client.messages.create(**kwargs)
+            return response
+
+        with self.client.messages.stream(**kwargs) as response_stream:
+            yield from response_stream.text_stream
+            return response_stream.get_final_message()
+
+    def _run_agentic_loop(self, stream: bool) -> Generator[str, None, str]:
+        """Answer the latest user message, executing tools until Claude stops using them.
+
+        Args:
+            stream: Whether to stream responses and yield their text deltas.
+
+        Yields:
+            Text deltas, only when streaming.
+
+        Returns:
+            Claude's final response text.
+        """
         # Agentic loop: keep asking Claude until it stops using tools
         final_response = ""
         max_iterations = 10  # Prevent infinite loops
 
         for iteration in range(max_iterations):
-            logger.info(f"Iteration {iteration + 1}")
+            logger.info("Iteration %d", iteration + 1)
 
             # Get response from Claude
-            response = self.client.messages.create(
-                model="claude-haiku-4-5-20251001",
+            response = yield from self._request(
+                stream,
+                model=MODEL,
                 max_tokens=1024,
-                system=self.system_prompt,
-                tools=TOOLS,  # type: ignore[arg-type]
-                messages=self.conversation_history,  # type: ignore[arg-type]
+                system=self.system_blocks,
+                tools=CACHED_TOOLS,
+                messages=with_cache_breakpoint(self.conversation_history),
+            )
+            logger.info(
+                "Cache usage: read=%s created=%s",
+                response.usage.cache_read_input_tokens,
+                response.usage.cache_creation_input_tokens,
             )
 
-            # Process response content blocks
+            # Pass 1: collect text and tool_use blocks, preserving their order
             assistant_content: list[dict[str, Any]] = []
-            tool_calls: list[dict[str, Any]] = []
-            tool_calls_made = False
+            pending: list[ToolUseBlock] = []
 
             for block in response.content:
                 if isinstance(block, TextBlock):
                     final_response = block.text
                     assistant_content.append({"type": "text", "text": block.text})
                 elif isinstance(block, ToolUseBlock):
-                    tool_calls_made = True
                     assistant_content.append(
                         {
                             "type": "tool_use",
@@ -84,22 +383,17 @@ class ClaudeAgent:
                             "input": block.input,
                         }
                     )
+                    pending.append(block)
 
-                    # Execute the tool and collect results
-                    tool_result = self.tool_executor.execute_tool(block.name, block.input)
-                    logger.info(f"Tool result: {tool_result}")
-
-                    tool_calls.append(
-                        {
-                            "type": "tool_result",
-                            "tool_use_id": block.id,
-                            "content": tool_result,
-                        }
-                    )
+            # Pass 2: execute the collected tool calls as one batch
+            tool_calls = self._execute_tool_calls(pending)
+            tool_calls_made = bool(pending)
 
             # Add assistant response to history only if there's content
             if assistant_content:
-                self.conversation_history.append({"role": "assistant", "content": assistant_content})
+                self.conversation_history.append(
+                    {"role": "assistant", "content": compact_content(assistant_content)}
+                )
 
             # If tool calls were made, add all tool results in a single user message
             if tool_calls:
@@ -109,16 +403,140 @@ class ClaudeAgent:
             if not tool_calls_made:
                 break
 
-        logger.info(f"Final response: {final_response}")
+        logger.info("Final response: %s", final_response)
         return final_response
 
+    def _process_simple_message(self, stream: bool) -> Generator[str, None, str]:
+        """Answer the latest user message with a single tool-free round trip.
+
+        Tools are still declared (history may contain tool_use blocks, which the
+        API requires to be backed by definitions) but tool_choice forbids calling
+        them, so the response is plain text and no re-entry loop is needed.
+
+        Args:
+            stream: Whether to stream the response and yield its text deltas.
+
+        Yields:
+            Text deltas, only when streaming.
+
+        Returns:
+            Claude's response text.
+        """
+        logger.info("Simple message, skipping agentic loop")
+
+        response = yield from self._request(
+            stream,
+            model=MODEL,
+            max_tokens=SIMPLE_MAX_TOKENS,
+            system=self.system_blocks,
+            tools=CACHED_TOOLS,
+            tool_choice={"type": "none"},
+            messages=with_cache_breakpoint(self.conversation_history),
+        )
+
+        final_response = ""
+        assistant_content: list[dict[str, Any]] = []
+        for block in response.content:
+            if isinstance(block, TextBlock):
+                final_response = block.text
+                assistant_content.append({"type": "text", "text": block.text})
+
+        if assistant_content:
+            self.conversation_history.append(
+                {"role": "assistant", "content": compact_content(assistant_content)}
+            )
+
+        logger.info("Final response: %s", final_response)
+        return final_response
+
+    def _replay_turn(self, user_input: str, cached: CachedTurn) -> str:
+        """Replay a cached turn: restore its history and re-run its tool calls.
+
+        Args:
+            user_input: User message that matched the cached turn.
+            cached: Cached turn to replay.
+
+        Returns:
+            The cached response text.
+        """
+        logger.info("Replaying cached turn for: %s", user_input)
+
+        self.conversation_history.append({"role": "user", "content": user_input})
+        self.conversation_history.extend(cached.messages)
+
+        for message in cached.messages:
+            if message["role"] != "assistant" or isinstance(message["content"], str):
+                continue
+            for block in message["content"]:
+                if block["type"] == "tool_use":
+                    self.tool_executor.execute_tool(block["name"], block["input"])
+
+        return cached.final_response
+
+    def _execute_tool_calls(self, pending: list[ToolUseBlock]) -> list[dict[str, Any]]:
+        """Execute a batch of tool calls and build their tool_result blocks.
+
+        Tools run in the order Claude emitted them: later calls in a batch commonly
+        reference elements created by earlier ones (e.g. a button placed in a
+        container created in the same response), so results are zipped back by
+        position to keep tool_result blocks aligned with their tool_use blocks.
+
+        Args:
+            pending: Tool use blocks collected from a single Claude response.
+
+        Returns:
+            List of tool_result content blocks, one per tool call.
+        """
+        results = self.tool_executor.execute_tools((block.name, block.input) for block in pending)
+
+        tool_calls: list[dict[str, Any]] = []
+        for block, tool_result in zip(pending, results, strict=True):
+            logger.info("Tool result: %s", tool_result)
+            tool_calls.append(
+                {
+                    "type": "tool_result",
+                    "tool_use_id": block.id,
+                    "content": tool_result,
+                }
+            )
+        return tool_calls
+
+    def warm_prompt_cache(self) -> None:
+        """Refresh the cached prompt prefix with a minimal request.
+
+        The ephemeral cache expires after five minutes without use. Re-sending the
+        system prompt, tools and (for an idle session) the transcript so far keeps
+        the prefix warm, so the next real turn is served from cache. The warm-up
+        turn is not added to conversation history.
+
+        Skipped while a turn is running: its history may end with a tool_use whose
+        tool_result isn't recorded yet, and the API rejects a ping after it. Warming
+        does not count as activity for last_active.
+        """
+        if self.in_turn:
+            logger.info("Skipping prompt cache warm-up during a turn")
+            return
+        messages = [*with_cache_breakpoint(self.conversation_history), WARM_MESSAGE]
+        response = self.client.messages.create(
+            model=MODEL,
+            max_tokens=1,
+            system=self.system_blocks,  # type: ignore[arg-type]
+            tools=CACHED_TOOLS,  # type: ignore[arg-type]
+            messages=messages,  # type: ignore[arg-type]
+        )
+        logger.info(
+            "Prompt cache warmed: read=%s created=%s",
+            response.usage.cache_read_input_tokens,
+            response.usage.cache_creation_input_tokens,
+        )
+
     def send_welcome_message(self) -> str:
         """Generate welcome message on client connection.
 
         Returns:
             Welcome message for the client.
         """
-        return "Welcome to Agentic Calculator. I'm Claude, ready to assist."
+        return WELCOME_MESSAGE
 
     def get_ui_state(self) -> dict[str, Any]:
         """Get current UI state.
@@ -128,6 +546,22 @@ class ClaudeAgent:
         """
         return self.ui_state.get_state()
 
+    def get_ui_state_json(self) -> bytes:
+        """Get current UI state encoded as JSON.
+
+        Returns:
+            JSON bytes representing the current UI elements.
+        """
+        return self.ui_state.get_state_json()
+
+    def drain_ui_ops(self) -> list[dict[str, Any]]:
+        """Get the UI changes made since the last call.
+
+        Returns:
+            List of UI ops, oldest first (see UIState.drain_ops).
+        """
+        return self.ui_state.drain_ops()
+
     def reset_ui(self) -> None:
         """Reset UI state for a new session."""
         self.ui_state.reset()
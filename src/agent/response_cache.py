@@ -0,0 +1,118 @@
+"""Cache of agent turns, keyed by the normalized user input."""
+
+import logging
+import re
+import string
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DIGIT_PATTERN = re.compile(r"\d")
+PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+
+
+def normalize(text: str) -> str:
+    """Normalize text for exact lookups: lowercase, no punctuation, single spaces.
+
+    Args:
+        text: Text to normalize
+
+    Returns:
+        Normalized text
+    """
+    return " ".join(text.lower().translate(PUNCTUATION_TABLE).split())
+
+
+@dataclass
+class CachedTurn:
+    """A recorded agent turn that can be replayed into a fresh session."""
+
+    final_response: str
+    messages: list[dict[str, Any]] = field(default_factory=list)  # history after user input
+
+
+class ResponseCache:
+    """LRU cache of agent turns with TTL.
+
+    Entries are keyed by normalized input, so only inputs that differ in case,
+    punctuation or spacing share a turn. One cache is shared by agents running
+    in worker threads, so every access holds a lock.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: float = 300.0) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of cached turns before LRU eviction
+            ttl_seconds: Seconds a cached turn stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[str, tuple[CachedTurn, float]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def is_cacheable(user_input: str) -> bool:
+        """Check whether an input may be served from the cache.
+
+        Inputs with numbers are excluded: near-identical wording with different
+        operands must never share an answer.
+
+        Args:
+            user_input: User message
+
+        Returns:
+            True if the input can be cached
+        """
+        return not DIGIT_PATTERN.search(user_input)
+
+    def search(self, user_input: str) -> CachedTurn | None:
+        """Find a cached turn by its normalized input.
+
+        Args:
+            user_input: User message to look up
+
+        Returns:
+            CachedTurn on hit, None on miss
+        """
+        key = normalize(user_input)
+        with self.lock:
+            now = time.monotonic()
+            expired = [
+                stale
+                for stale, (_, stored) in self.entries.items()
+                if now - stored > self.ttl_seconds
+            ]
+            for stale in expired:
+                del self.entries[stale]
+
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            self.entries.move_to_end(key)
+            logger.info("Cache hit for '%s'", user_input)
+            return entry[0]
+
+    def put(self, user_input: str, turn: CachedTurn) -> None:
+        """Store a turn, evicting the least recently used entry when full.
+
+        Args:
+            user_input: User message that produced the turn
+            turn: Recorded turn to cache
+        """
+        key = normalize(user_input)
+        with self.lock:
+            self.entries[key] = (turn, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached turns."""
+        with self.lock:
+            self.entries.clear()
@@ -1,16 +1,43 @@
 """Executes tool calls made by Claude."""
 
 import logging
+from collections.abc import Callable, Iterable
 from typing import Any
 
+from src.agent.tools import TOOLS
 from src.agent.ui_state import UIState
 
 logger = logging.getLogger(__name__)
 
+# Validation errors returned to Claude when required tool inputs are missing
+DISPLAY_TEXT_REQUIRED_ERROR = "Error: display_text requires 'content' and 'id'"
+CREATE_BUTTON_REQUIRED_ERROR = "Error: create_button requires 'label', 'id', and 'callback_id'"
+CREATE_CONTAINER_REQUIRED_ERROR = "Error: create_container requires 'id'"
+CREATE_CONTAINER_LAYOUT_ERROR = (
+    "Error: create_container requires either 'flex_direction' or 'rows'/'cols'"
+)
+UPDATE_ELEMENT_REQUIRED_ERROR = "Error: update_element requires 'id'"
+
+# Required input keys per tool, taken from the tool schemas offered to Claude
+REQUIRED_INPUTS: dict[str, tuple[str, ...]] = {
+    tool["name"]: tuple(tool["input_schema"]["required"]) for tool in TOOLS
+}
+REQUIRED_ERRORS: dict[str, str] = {
+    "display_text": DISPLAY_TEXT_REQUIRED_ERROR,
+    "create_button": CREATE_BUTTON_REQUIRED_ERROR,
+    "create_container": CREATE_CONTAINER_REQUIRED_ERROR,
+    "update_element": UPDATE_ELEMENT_REQUIRED_ERROR,
+}
+
+# Longest tool result sent back to Claude; results are kept in conversation history
+MAX_RESULT_LENGTH = 2048
+
 
 class ToolExecutor:
     """Executes tools and updates UI state."""
 
+    __slots__ = ("ui_state", "handlers")
+
     def __init__(self, ui_state: UIState) -> None:
         """Initialize executor with UI state.
 
@@ -18,6 +45,12 @@ class ToolExecutor:
             ui_state: UIState instance to update
         """
         self.ui_state = ui_state
+        self.handlers: dict[str, Callable[[dict[str, Any]], str]] = {
+            "display_text": self._execute_display_text,
+            "create_button": self._execute_create_button,
+            "create_container": self._execute_create_container,
+            "update_element": self._execute_update_element,
+        }
 
     def execute_tool(self, tool_name: str, tool_input: dict[str, Any]) -> str:
         """Execute a tool call.
@@ -27,41 +60,54 @@ class ToolExecutor:
             tool_input: Input parameters for the tool
 
         Returns:
-            Result message from tool execution
+            Result message from tool execution, truncated to MAX_RESULT_LENGTH
         """
-        logger.info(f"Executing tool: {tool_name} with input: {tool_input}")
-
-        if tool_name == "display_text":
-            return self._execute_display_text(tool_input)
-        elif tool_name == "create_button":
-            return self._execute_create_button(tool_input)
-        elif tool_name == "create_container":
-            return self._execute_create_container(tool_input)
-        elif tool_name == "update_element":
-            return self._execute_update_element(tool_input)
+        logger.info("Executing tool: %s with input: %s", tool_name, tool_input)
+
+        handler = self.handlers.get(tool_name)
+        if handler is None:
+            result = f"Error: Unknown tool '{tool_name}'"
+        elif not all(tool_input.get(key) for key in REQUIRED_INPUTS.get(tool_name, ())):
+            result = REQUIRED_ERRORS[tool_name]
         else:
-            return f"Error: Unknown tool '{tool_name}'"
+            result = handler(tool_input)
+
+        if len(result) > MAX_RESULT_LENGTH:
+            truncated = len(result) - MAX_RESULT_LENGTH
+            result = f"{result[:MAX_RESULT_LENGTH]}... [truncated {truncated} chars]"
+        return result
+
+    def execute_tools(self, calls: Iterable[tuple[str, dict[str, Any]]]) -> list[str]:
+        """Execute a batch of tool calls in order.
+
+        Calls are not regrouped by tool: later calls commonly reference elements
+        created by earlier ones in the same batch.
+
+        Args:
+            calls: (tool_name, tool_input) pairs, in the order Claude emitted them
+
+        Returns:
+            Result message for each call, in the same order
+        """
+        execute_tool = self.execute_tool
+        return [execute_tool(tool_name, tool_input) for tool_name, tool_input in calls]
 
     def _execute_display_text(self, tool_input: dict[str, Any]) -> str:
         """Execute display_text tool.
 
         Args:
-            tool_input: Must contain 'content' and 'id' keys
+            tool_input: Validated input containing 'content' and 'id' keys
 
         Returns:
             Success or error message
         """
         try:
-            content = tool_input.get("content")
-            element_id = tool_input.get("id")
-
-            if not content or not element_id:
-                return "Error: display_text requires 'content' and 'id'"
-
+            content = tool_input["content"]
+            element_id = tool_input["id"]
             parent_id = tool_input.get("parent_id")
 
             self.ui_state.add_text(content, element_id, parent_id=parent_id)
-            logger.info(f"Displayed text: {element_id}")
+            logger.info("Displayed text: %s", element_id)
             return f"Text '{element_id}' displayed successfully"
         except Exception as e:
             error_msg = f"Error displaying text: {e}"
@@ -72,19 +118,15 @@ class ToolExecutor:
         """Execute create_button tool.
 
         Args:
-            tool_input: Must contain 'label', 'id', and 'callback_id' keys
+            tool_input: Validated input containing 'label', 'id', and 'callback_id' keys
 
         Returns:
             Success or error message
         """
         try:
-            label = tool_input.get("label")
-            element_id = tool_input.get("id")
-            callback_id = tool_input.get("callback_id")
-
-            if not label or not element_id or not callback_id:
-                return "Error: create_button requires 'label', 'id', and 'callback_id'"
-
+            label = tool_input["label"]
+            element_id = tool_input["id"]
+            callback_id = tool_input["callback_id"]
             parent_id = tool_input.get("parent_id")
 
             self.ui_state.add_button(
@@ -93,7 +135,7 @@ class ToolExecutor:
                 callback_id,
                 parent_id=parent_id,
             )
-            logger.info(f"Created button: {element_id}")
+            logger.info("Created button: %s", element_id)
             return f"Button '{element_id}' created successfully"
         except Exception as e:
             error_msg = f"Error creating button: {e}"
@@ -104,17 +146,14 @@ class ToolExecutor:
         """Execute create_container tool.
 
         Args:
-            tool_input: Must contain 'id'. Either 'flex_direction' for flexbox layout,
-                       or 'rows'/'cols' for grid layout.
+            tool_input: Validated input containing 'id'. Either 'flex_direction' for
+                       flexbox layout, or 'rows'/'cols' for grid layout.
 
         Returns:
             Success or error message
         """
         try:
-            element_id = tool_input.get("id")
-
-            if not element_id:
-                return "Error: create_container requires 'id'"
+            element_id = tool_input["id"]
 
             # Extract parameters
             flex_direction = tool_input.get("flex_direction")
@@ -126,7 +165,7 @@ class ToolExecutor:
 
             # Validate that either flex_direction or grid parameters are provided
             if not flex_direction and rows is None and cols is None:
-                return "Error: create_container requires either 'flex_direction' or 'rows'/'cols'"
+                return CREATE_CONTAINER_LAYOUT_ERROR
 
             self.ui_state.add_container(
                 element_id,
@@ -137,7 +176,7 @@ class ToolExecutor:
                 rows=rows,
                 cols=cols,
             )
-            logger.info(f"Created container: {element_id}")
+            logger.info("Created container: %s", element_id)
             return f"Container '{element_id}' created successfully"
         except Exception as e:
             error_msg = f"Error creating container: {e}"
@@ -148,17 +187,13 @@ class ToolExecutor:
         """Execute update_element tool.
 
         Args:
-            tool_input: Must contain 'id' key, optional: content, callback_id
+            tool_input: Validated input containing 'id' key, optional: content, callback_id
 
         Returns:
             Success or error message
         """
         try:
-            element_id = tool_input.get("id")
-
-            if not element_id:
-                return "Error: update_element requires 'id'"
-
+            element_id = tool_input["id"]
             content = tool_input.get("content")
             callback_id = tool_input.get("callback_id")
 
@@ -169,7 +204,7 @@ class ToolExecutor:
             )
 
             if success:
-                logger.info(f"Updated element: {element_id}")
+                logger.info("Updated element: %s", element_id)
                 return f"Element '{element_id}' updated successfully"
             else:
                 return f"Error: Element '{element_id}' not found"
@@ -1,19 +1,9 @@
 """Tool definitions for Claude to interact with the UI."""
 
-from typing import Any, TypedDict
-
-
-# Tool type definition
-class ToolDefinition(TypedDict):
-    """Type for tool definition."""
-
-    name: str
-    description: str
-    input_schema: dict[str, Any]
-
+from typing import Any
 
 # Display text tool
-DISPLAY_TEXT_TOOL: ToolDefinition = {
+DISPLAY_TEXT_TOOL: dict[str, Any] = {
     "name": "display_text",
     "description": "Display text content on the UI. Use this to show information to the user.",
     "input_schema": {
@@ -37,7 +27,7 @@ DISPLAY_TEXT_TOOL: ToolDefinition = {
 }
 
 # Create button tool
-CREATE_BUTTON_TOOL: ToolDefinition = {
+CREATE_BUTTON_TOOL: dict[str, Any] = {
     "name": "create_button",
     "description": "Create a clickable button on the UI. When clicked, sends back the callback_id.",
     "input_schema": {
@@ -65,7 +55,7 @@ CREATE_BUTTON_TOOL: ToolDefinition = {
 }
 
 # Create container tool
-CREATE_CONTAINER_TOOL: ToolDefinition = {
+CREATE_CONTAINER_TOOL: dict[str, Any] = {
     "name": "create_container",
     "description": "Create a container to group UI elements with flexbox or grid layout.",
     "input_schema": {
@@ -107,7 +97,7 @@ CREATE_CONTAINER_TOOL: ToolDefinition = {
 }
 
 # Update element tool
-UPDATE_ELEMENT_TOOL: ToolDefinition = {
+UPDATE_ELEMENT_TOOL: dict[str, Any] = {
     "name": "update_element",
     "description": "Update properties of an existing element. Preserves element type, parent, and other properties.",
     "input_schema": {
@@ -130,10 +120,10 @@ UPDATE_ELEMENT_TOOL: ToolDefinition = {
     },
 }
 
-# All available tools
-TOOLS = [
+# All available tools (a tuple, so the shared module constant can't be mutated)
+TOOLS: tuple[dict[str, Any], ...] = (
     DISPLAY_TEXT_TOOL,
     CREATE_BUTTON_TOOL,
     CREATE_CONTAINER_TOOL,
     UPDATE_ELEMENT_TOOL,
-]
+)
@@ -1,39 +1,56 @@
 """Manages the current UI state."""
 
 from dataclasses import dataclass, field
+from enum import StrEnum
 from typing import Any
 
+import orjson
 
-@dataclass
+
+class ElementType(StrEnum):
+    """UI element types. Members are strings, so they serialize unchanged."""
+
+    TEXT = "text"
+    BUTTON = "button"
+    CONTAINER = "container"
+
+
+# Property that update_element's 'content' maps to, per element type
+CONTENT_PROPERTY: dict[ElementType, str] = {
+    ElementType.TEXT: "content",
+    ElementType.BUTTON: "label",
+}
+
+
+@dataclass(slots=True)
 class UIElement:
     """Represents a single UI element."""
 
-    type: str  # "text", "button", or "container"
+    type: ElementType
     id: str
     properties: dict[str, Any] = field(default_factory=dict)
-    layout: dict[str, Any] = field(default_factory=dict)  # flex properties
+    layout: dict[str, Any] | None = None  # flex/grid properties (containers only)
     parent_id: str | None = None  # Parent container ID (None = root level)
 
-    def to_dict(self) -> dict[str, Any]:
-        """Convert to dictionary representation."""
-        result = {
-            "type": self.type,
-            "id": self.id,
-            "properties": self.properties,
-        }
-        if self.layout:
-            result["layout"] = self.layout
-        if self.parent_id:
-            result["parent_id"] = self.parent_id
-        return result
-
 
 class UIState:
     """Manages UI state - tracks all elements currently displayed."""
 
+    __slots__ = (
+        "elements",
+        "element_dicts",
+        "pending_ops",
+        "cached_state",
+        "cached_state_json",
+    )
+
     def __init__(self) -> None:
         """Initialize empty UI state."""
-        self.elements: list[UIElement] = []
+        self.elements: dict[str, UIElement] = {}  # insertion-ordered, keyed by ID
+        self.element_dicts: list[dict[str, Any]] = []  # serialized elements, built once
+        self.pending_ops: list[dict[str, Any]] = []  # changes not yet sent to the client
+        self.cached_state: dict[str, Any] | None = None  # cleared by every mutation
+        self.cached_state_json: bytes | None = None
 
     def _validate_parent(self, parent_id: str | None) -> str | None:
         """Validate and return parent ID, or None for root level.
@@ -50,18 +67,49 @@ class UIState:
             return None
 
         # Find parent element
-        parent = next((elem for elem in self.elements if elem.id == parent_id), None)
+        parent = self.elements.get(parent_id)
         if parent is None:
             # Parent doesn't exist, fall back to root
             return None
 
         # Check if parent is a container
-        if parent.type != "container":
+        if parent.type is not ElementType.CONTAINER:
             # Parent is not a container, fall back to root
             return None
 
         return parent_id
 
+    def _invalidate(self) -> None:
+        """Drop memoized state after a mutation."""
+        self.cached_state = None
+        self.cached_state_json = None
+
+    def _append(self, element: UIElement) -> None:
+        """Append an element, index it by ID, and build its serialized form.
+
+        If an ID is reused, lookups keep resolving to the first element with it,
+        while the serialized state still lists both.
+        The serialized dict shares the element's properties and layout, so
+        in-place updates show up without rebuilding it.
+
+        Args:
+            element: Element to add
+        """
+        item: dict[str, Any] = {
+            "type": element.type,
+            "id": element.id,
+            "properties": element.properties,
+        }
+        if element.layout:
+            item["layout"] = element.layout
+        if element.parent_id:
+            item["parent_id"] = element.parent_id
+
+        self.elements.setdefault(element.id, element)
+        self.element_dicts.append(item)
+        self.pending_ops.append({"op": "add", "element": item})
+        self._invalidate()
+
     def get_element(self, element_id: str) -> UIElement | None:
         """Get element by ID.
 
@@ -71,7 +119,7 @@ class UIState:
         Returns:
             UIElement if found, None otherwise
         """
-        return next((elem for elem in self.elements if elem.id == element_id), None)
+        return self.elements.get(element_id)
 
     def add_text(
         self,
@@ -86,15 +134,16 @@ class UIState:
             element_id: Unique identifier for this element
             parent_id: Parent container ID (None = root level)
         """
-        validated_parent = self._validate_parent(parent_id)
+        # Root-level inserts (the common case) skip parent validation entirely
+        validated_parent = None if parent_id is None else self._validate_parent(parent_id)
 
         element = UIElement(
-            type="text",
+            type=ElementType.TEXT,
             id=element_id,
             properties={"content": content},
             parent_id=validated_parent,
         )
-        self.elements.append(element)
+        self._append(element)
 
     def add_button(
         self,
@@ -111,15 +160,16 @@ class UIState:
             callback_id: Identifier sent back when button is clicked
             parent_id: Parent container ID (None = root level)
         """
-        validated_parent = self._validate_parent(parent_id)
+        # Root-level inserts (the common case) skip parent validation entirely
+        validated_parent = None if parent_id is None else self._validate_parent(parent_id)
 
         element = UIElement(
-            type="button",
+            type=ElementType.BUTTON,
             id=element_id,
             properties={"label": label, "callback_id": callback_id},
             parent_id=validated_parent,
         )
-        self.elements.append(element)
+        self._append(element)
 
     def add_container(
         self,
@@ -145,46 +195,56 @@ class UIState:
             rows: Number of rows for grid layout
             cols: Number of columns for grid layout
         """
-        layout: dict[str, Any] = {}
-
         # Grid layout (when rows and cols are specified)
         if rows is not None or cols is not None:
-            if rows is not None:
-                layout["rows"] = rows
-            if cols is not None:
-                layout["cols"] = cols
-            if gap is not None:
-                layout["gap"] = gap
-        # Flexbox layout (default)
+            options: tuple[tuple[str, Any], ...] = (("rows", rows), ("cols", cols), ("gap", gap))
+        # Flexbox layout (default to column if no direction is specified)
         else:
-            if flex_direction is not None:
-                layout["flex_direction"] = flex_direction
-            else:
-                layout["flex_direction"] = "column"  # Default to column if not specified
-            if justify_content is not None:
-                layout["justify_content"] = justify_content
-            if gap is not None:
-                layout["gap"] = gap
+            options = (
+                ("flex_direction", "column" if flex_direction is None else flex_direction),
+                ("justify_content", justify_content),
+                ("gap", gap),
+            )
+        layout = {key: value for key, value in options if value is not None}
 
-        validated_parent = self._validate_parent(parent_id)
+        # Root-level inserts (the common case) skip parent validation entirely
+        validated_parent = None if parent_id is None else self._validate_parent(parent_id)
 
         element = UIElement(
-            type="container",
+            type=ElementType.CONTAINER,
             id=element_id,
             layout=layout,
             parent_id=validated_parent,
         )
-        self.elements.append(element)
+        self._append(element)
 
     def get_state(self) -> dict[str, Any]:
         """Get current UI state as a dictionary.
 
+        The result is memoized until the next mutation, so repeated reads return
+        the same object; callers must treat it as read-only. Element dicts are
+        built once when the element is added and reused across snapshots.
+
         Returns:
             Dictionary representation of current UI elements
         """
-        return {
-            "elements": [elem.to_dict() for elem in self.elements],
-        }
+        if self.cached_state is None:
+            self.cached_state = {
+                "elements": list(self.element_dicts),
+            }
+        return self.cached_state
+
+    def get_state_json(self) -> bytes:
+        """Get current UI state encoded as JSON.
+
+        Memoized like get_state, so an unchanged state is encoded only once.
+
+        Returns:
+            JSON encoding of get_state()
+        """
+        if self.cached_state_json is None:
+            self.cached_state_json = orjson.dumps(self.get_state())
+        return self.cached_state_json
 
     def update_element(
         self,
@@ -209,20 +269,42 @@ class UIState:
         if element is None:
             return False
 
-        # Update properties if provided
+        # Update properties if provided (containers have no content)
         if content is not None:
-            if element.type in ("text", "button"):
-                if element.type == "text":
-                    element.properties["content"] = content
-                else:  # button
-                    element.properties["label"] = content
+            content_property = CONTENT_PROPERTY.get(element.type)
+            if content_property is not None:
+                element.properties[content_property] = content
 
         if callback_id is not None:
-            if element.type == "button":
+            if element.type is ElementType.BUTTON:
                 element.properties["callback_id"] = callback_id
 
+        self.pending_ops.append(
+            {"op": "update", "id": element_id, "properties": element.properties}
+        )
+        self._invalidate()
         return True
 
+    def drain_ops(self) -> list[dict[str, Any]]:
+        """Return the changes made since the last drain and forget them.
+
+        Each op is one of:
+            {"op": "add", "element": <element dict>}
+            {"op": "update", "id": <element ID>, "properties": <new properties>}
+            {"op": "clear"}
+
+        Applying them in order to the previous state yields get_state().
+
+        Returns:
+            List of pending ops, oldest first
+        """
+        ops = self.pending_ops
+        self.pending_ops = []
+        return ops
+
     def reset(self) -> None:
         """Clear all UI elements."""
-        self.elements = []
+        self.elements.clear()
+        self.element_dicts = []
+        self.pending_ops = [{"op": "clear"}]
+        self._invalidate()
@@ -1,55 +1,62 @@
 import asyncio
-import json
+import hashlib
 import logging
-from typing import Any
-
-from fastapi import FastAPI, WebSocket
-from fastapi.responses import FileResponse
+import os
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+
+import orjson
+from fastapi import FastAPI, Request, Response, WebSocket
 from fastapi.staticfiles import StaticFiles
+from starlette.types import Scope
 
-from src.agent.claude_agent import ClaudeAgent
-from src.config import get_anthropic_api_key
+from src.agent.claude_agent import ClaudeAgent, close_anthropic_clients
+from src.agent.response_cache import ResponseCache
+from src.config import get_anthropic_api_key, load_env
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Agentic Calculator")
-
-# Mount static files
-app.mount("/static", StaticFiles(directory="src/static"), name="static")
-
-# Global agent instance
-# NOTE: This implementation assumes a single client connection at a time.
-# For production use with multiple concurrent clients, these globals should be moved
-# to a per-connection context (e.g., storing in the WebSocket object or a session manager)
-# to prevent state interference between clients.
-agent: ClaudeAgent | None = None
-initialization_complete: asyncio.Event | None = None
-pending_messages: list[str] = []
+T = TypeVar("T")
 
 
-@app.get("/health")
-def health_check() -> dict[str, str]:
-    """Health check endpoint."""
-    return {"status": "ok"}
+class VersionedStaticFiles(StaticFiles):
+    """Static files that browsers may cache forever when requested with a version.
 
+    A "?v=<content hash>" query changes whenever the file does, so such URLs are
+    served as immutable; unversioned URLs keep the default revalidation.
+    """
 
-@app.get("/")
-def read_root() -> FileResponse:
-    """Root endpoint - serves the main HTML client."""
-    return FileResponse("src/static/index.html", media_type="text/html")
+    def file_response(
+        self,
+        full_path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if scope["query_string"].startswith(b"v="):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
 
 
-async def initialize_agent_background(websocket: WebSocket) -> None:
-    """Initialize agent in background and send init message when ready.
+def versioned_asset_url(name: str) -> str:
+    """Build a /static URL carrying a hash of the file's contents.
 
     Args:
-        websocket: WebSocket connection to send init message to.
+        name: File name inside src/static.
+
+    Returns:
+        URL such as "/static/client.js?v=<hash>"
     """
-    global agent, initialization_complete
+    with open(os.path.join("src/static", name), "rb") as asset:
+        digest = hashlib.md5(asset.read(), usedforsecurity=False).hexdigest()
+    return f"/static/{name}?v={digest[:12]}"
 
-    try:
-        api_key = get_anthropic_api_key()
-        system_prompt = """You are a calculator assistant with an agentic UI paradigm.
+
+# System prompt for every calculator session
+SYSTEM_PROMPT = """You are a calculator assistant with an agentic UI paradigm.
 
 Your primary task is to build and maintain the UI through tool calls. Text responses are secondary.
 Keep text responses terse and action-focused. The UI is the main interface, not your words.
@@ -73,45 +80,333 @@ UI building guidelines:
 
 Response style: Keep your text brief. Let the UI do the talking."""
 
-        logger.info("Starting background agent initialization")
-        agent = ClaudeAgent(
-            system_prompt=system_prompt,
-            api_key=api_key,
-        )
+# Prompt that builds the calculator UI when a session starts
+INITIAL_PROMPT = "Create a calculator"
+
+# Seconds between prompt cache refreshes (the ephemeral cache lives five minutes)
+PROMPT_CACHE_WARM_INTERVAL = 240.0
+
+# Seconds without a turn after which a session's prompt cache is left to expire
+PROMPT_CACHE_MAX_IDLE = 1800.0
+
+# Agents kept ready with the calculator already built, so a connect skips the LLM round-trip
+AGENT_POOL_SIZE = 1
+
+# LLM calls allowed in flight at once across all connections (protects upstream rate limits)
+MAX_CONCURRENT_LLM_CALLS = 8
+llm_slots = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+
+def release_llm_slot(call: asyncio.Future[Any]) -> None:
+    """Free an LLM slot once its worker thread has finished.
+
+    Args:
+        call: Finished LLM call; its exception is consumed here in case the
+            awaiting task was cancelled and will never read it.
+    """
+    llm_slots.release()
+    if not call.cancelled():
+        call.exception()
+
+
+async def run_llm_call(func: Callable[..., T], *args: Any) -> T:
+    """Run a blocking LLM call in a worker thread, waiting for a free slot first.
+
+    A worker thread cannot be stopped, so the slot is held until the thread
+    finishes even when the awaiting task is cancelled (e.g. a client
+    disconnecting mid-turn).
+
+    Args:
+        func: Blocking function that calls the LLM.
+        *args: Arguments passed to func.
+
+    Returns:
+        The function's result
+    """
+    await llm_slots.acquire()
+    call = asyncio.ensure_future(asyncio.to_thread(func, *args))
+    call.add_done_callback(release_llm_slot)
+    return await asyncio.shield(call)
+
+
+async def keep_prompt_cache_warm() -> None:
+    """Periodically refresh the cached prompt prefix of recently active sessions.
+
+    Pooled agents are warmed too, so a client taking one finds its cache hot.
+    Sessions in the middle of a turn are skipped (the turn itself uses the cache),
+    and so are sessions idle for longer than PROMPT_CACHE_MAX_IDLE, so an
+    abandoned tab stops costing requests.
+    """
+    while True:
+        await asyncio.sleep(PROMPT_CACHE_WARM_INTERVAL)
+        now = time.monotonic()
+        for session_agent in [*active_agents, *pooled_agents]:
+            if session_agent.in_turn or now - session_agent.last_active > PROMPT_CACHE_MAX_IDLE:
+                continue
+            try:
+                await run_llm_call(session_agent.warm_prompt_cache)
+            except Exception as e:
+                logger.warning("Prompt cache warm-up failed: %s", e)
+
+
+def build_session_agent() -> tuple[ClaudeAgent, str]:
+    """Create an agent and run the initial prompt that builds the calculator.
+
+    Blocks on the LLM round-trip.
+
+    Returns:
+        Tuple of (agent with the calculator UI built, LLM response text)
+
+    Raises:
+        ValueError: If the Anthropic API key is not configured
+    """
+    new_agent = ClaudeAgent(
+        system_prompt=SYSTEM_PROMPT,
+        api_key=get_anthropic_api_key(),
+        response_cache=response_cache,
+    )
+    return new_agent, new_agent.process_message(INITIAL_PROMPT)
+
+
+async def fill_agent_pool() -> None:
+    """Build agents in a worker thread until the pool is full.
+
+    Failures (e.g. a missing API key) are logged and leave the pool short;
+    connections then build their agent inline.
+    """
+    while agent_pool is not None and not agent_pool.full():
+        try:
+            ready = await run_llm_call(build_session_agent)
+        except Exception as e:
+            logger.warning("Failed to pre-build agent: %s", e)
+            return
+        if agent_pool is None or agent_pool.full():
+            return
+        agent_pool.put_nowait(ready)
+        pooled_agents.add(ready[0])
+
+
+def refill_agent_pool() -> None:
+    """Start filling the agent pool unless a fill is already running."""
+    global pool_filler
+
+    if pool_filler is None or pool_filler.done():
+        pool_filler = asyncio.create_task(fill_agent_pool())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Application lifespan: set up the agent pool and keep the prompt cache warm.
+
+    The pool is first filled after a client connects, so starting the server
+    (or reloading it) makes no LLM request. Releases resources on shutdown.
+    """
+    global agent_pool
+
+    load_env()
+    agent_pool = asyncio.Queue(maxsize=AGENT_POOL_SIZE)
+    warmer = asyncio.create_task(keep_prompt_cache_warm())
+    yield
+    warmer.cancel()
+    if pool_filler is not None:
+        pool_filler.cancel()
+    agent_pool = None
+    pooled_agents.clear()
+    close_anthropic_clients()
+
+
+app = FastAPI(title="Agentic Calculator", lifespan=lifespan)
+
+# Mount static files
+app.mount("/static", VersionedStaticFiles(directory="src/static", check_dir=False), name="static")
+
+# Agents of the open connections; each connection owns its agent
+active_agents: set[ClaudeAgent] = set()
+
+# Pre-built agents, created by the application lifespan (None when it is not running)
+agent_pool: asyncio.Queue[tuple[ClaudeAgent, str]] | None = None
+pooled_agents: set[ClaudeAgent] = set()  # agents waiting in the pool, for cache warming
+pool_filler: asyncio.Task[None] | None = None
+
+# The single-page client, read once with its script URL versioned; browsers revalidate it by ETag
+with open("src/static/index.html", "rb") as index_file:
+    INDEX_HTML = index_file.read().replace(
+        b'src="/static/client.js"', f'src="{versioned_asset_url("client.js")}"'.encode()
+    )
+INDEX_HEADERS = {
+    "ETag": f'"{hashlib.md5(INDEX_HTML, usedforsecurity=False).hexdigest()}"',
+    "Cache-Control": "no-cache",
+}
+
+# Health check response body, encoded once
+HEALTH_BODY = orjson.dumps({"status": "ok"})
 
-        # Auto-initialize LLM with "Create a calculator" prompt
-        logger.info("Calling agent.process_message with 'Create a calculator'")
-        initial_prompt = "Create a calculator"
-        llm_response = agent.process_message(initial_prompt)
-        logger.info(
-            f"LLM response: {llm_response[:100] if llm_response else 'None'}..."
-        )
+# Fixed frame sent as soon as a client connects, encoded once
+CONNECTED_FRAME = orjson.dumps({"type": "connected"}).decode()
+
+# Session-opening turns shared across connections (e.g. the initial calculator build)
+response_cache = ResponseCache()
+
+
+async def receive_messages(
+    websocket: WebSocket, messages: asyncio.Queue[str | bytes | None]
+) -> None:
+    """Read client frames into a queue until the connection closes.
+
+    Runs from connect, so messages sent before initialization completes are kept
+    and handled in order once it does. A None is queued when reading stops.
+
+    Args:
+        websocket: WebSocket connection to read from.
+        messages: Queue receiving each frame's payload, text or binary.
+    """
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                break
+            text = frame.get("text")
+            messages.put_nowait(frame["bytes"] if text is None else text)
+    except Exception as e:
+        logger.info("Stopped receiving messages: %s", type(e).__name__)
+    finally:
+        messages.put_nowait(None)
+
+
+async def send_frames(websocket: WebSocket, outbox: asyncio.Queue[str | None]) -> None:
+    """Send queued text frames in order until a None is queued.
+
+    Runs as the connection's only sender, so message handling never waits on
+    the socket draining.
+
+    Args:
+        websocket: WebSocket connection to send to.
+        outbox: Queue of encoded frames to send.
+    """
+    try:
+        while (frame := await outbox.get()) is not None:
+            await websocket.send_text(frame)
+    except Exception as e:
+        logger.info("Stopped sending messages: %s", type(e).__name__)
+
+
+def queue_message(outbox: asyncio.Queue[str | None], message: dict[str, Any]) -> None:
+    """Encode a message with orjson and queue it for sending.
+
+    Args:
+        outbox: The connection's queue of outgoing frames.
+        message: Message to send; may embed pre-encoded orjson.Fragment values.
+    """
+    outbox.put_nowait(orjson.dumps(message).decode())
+
+
+def queue_error(outbox: asyncio.Queue[str | None], error: str) -> None:
+    """Queue an error frame.
+
+    Args:
+        outbox: The connection's queue of outgoing frames.
+        error: Error message shown to the user.
+    """
+    queue_message(outbox, {"type": "error", "message": error})
+
+
+@app.get("/health")
+def health_check() -> Response:
+    """Health check endpoint, answered with a pre-encoded body."""
+    return Response(content=HEALTH_BODY, media_type="application/json")
+
+
+@app.get("/")
+def read_root(request: Request) -> Response:
+    """Root endpoint - serves the main HTML client from memory."""
+    if request.headers.get("if-none-match") == INDEX_HEADERS["ETag"]:
+        return Response(status_code=304, headers=INDEX_HEADERS)
+    return Response(content=INDEX_HTML, media_type="text/html", headers=INDEX_HEADERS)
+
+
+async def initialize_agent_background(
+    outbox: asyncio.Queue[str | None],
+) -> ClaudeAgent | None:
+    """Initialize agent in background and send init message when ready.
+
+    Args:
+        outbox: The connection's queue of outgoing frames.
+
+    Returns:
+        The connection's agent, or None if initialization failed
+    """
+    try:
+        if agent_pool is not None and not agent_pool.empty():
+            # Take a pre-built agent and replace it in the background
+            logger.info("Using pre-built agent from pool")
+            agent, llm_response = agent_pool.get_nowait()
+            pooled_agents.discard(agent)
+        else:
+            # Auto-initialize LLM with "Create a calculator" prompt
+            logger.info("Starting background agent initialization")
+            agent, llm_response = await run_llm_call(build_session_agent)
+        # Have an agent ready for the next client (the first connection starts the pool)
+        refill_agent_pool()
+        logger.info("LLM response: %.100s...", llm_response)
 
         # Send initial message with LLM-generated UI
         initial_message: dict[str, Any] = {
             "type": "init",
             "message": llm_response,
-            "ui_state": agent.get_ui_state(),
+            "ui_state": orjson.Fragment(agent.get_ui_state_json()),
         }
-        logger.info("Sending init message to client")
-        await websocket.send_json(initial_message)
-        logger.info("Init message sent successfully")
+        # The snapshot covers every change so far; later responses carry only new ones
+        agent.drain_ui_ops()
+        logger.info("Queueing init message for client")
+        queue_message(outbox, initial_message)
+        return agent
 
     except Exception as init_error:
-        logger.error(f"Error during initialization: {init_error}", exc_info=True)
-        try:
-            error_msg: dict[str, Any] = {
-                "type": "error",
-                "message": f"Initialization error: {str(init_error)}",
-            }
-            await websocket.send_json(error_msg)
-        except Exception as send_error:
-            logger.error(f"Failed to send error message: {send_error}")
-    finally:
-        # Signal that initialization is complete
-        if initialization_complete:
-            initialization_complete.set()
-            logger.info("Initialization complete signal sent")
+        logger.error("Error during initialization: %s", init_error, exc_info=True)
+        queue_error(outbox, f"Initialization error: {init_error}")
+        return None
+
+
+async def handle_message(
+    outbox: asyncio.Queue[str | None], agent: ClaudeAgent | None, data_raw: str | bytes
+) -> None:
+    """Process one client message and send the agent's response.
+
+    Args:
+        outbox: The connection's queue of outgoing frames.
+        agent: The connection's agent (None if initialization failed).
+        data_raw: Frame payload: a JSON button click or plain text.
+    """
+    # Most frames are JSON button clicks; anything else is plain text
+    try:
+        data_json = orjson.loads(data_raw)
+    except orjson.JSONDecodeError:
+        data_json = None
+
+    if isinstance(data_json, dict):
+        if data_json.get("type") != "button_click":
+            # Unknown JSON message type
+            logger.warning("Unknown message type: %s", data_json.get("type"))
+            return
+        # Handle button click callback
+        callback_id = data_json.get("callback_id")
+        logger.info("Button callback received: %s", callback_id)
+        user_input = f"button_click:{callback_id}"
+    else:
+        # Regular text message
+        user_input = data_raw if isinstance(data_raw, str) else data_raw.decode()
+        logger.info("Received text: %s", user_input)
+
+    if agent:
+        # The LLM round-trip blocks; keep it off the event loop
+        response = await run_llm_call(agent.process_message, user_input)
+
+        message: dict[str, Any] = {
+            "type": "response",
+            "message": response,
+            "ops": agent.drain_ui_ops(),
+        }
+        queue_message(outbox, message)
 
 
 @app.websocket("/ws")
@@ -122,93 +417,60 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
     1. Connection: Immediate "connected" message to client
     2. Initialization: Background task initializes agent and sends UI
     3. Message handling: Continuous loop processes user interactions
-    """
-    global agent, initialization_complete, pending_messages
 
+    Each connection builds and owns its agent, so concurrent clients don't share state.
+    """
     await websocket.accept()
     logger.info("Client connected")
 
-    # Initialize event for this connection
-    initialization_complete = asyncio.Event()
-    pending_messages = []
-
     # Send immediate "connected" confirmation
-    connected_msg: dict[str, Any] = {"type": "connected"}
-    await websocket.send_json(connected_msg)
-    logger.info("Sent connected confirmation to client")
+    outbox: asyncio.Queue[str | None] = asyncio.Queue()
+    outbox.put_nowait(CONNECTED_FRAME)
+    sender = asyncio.create_task(send_frames(websocket, outbox))
+    logger.info("Queued connected confirmation for client")
+
+    # Start reading right away; messages wait in the queue until init completes
+    messages: asyncio.Queue[str | bytes | None] = asyncio.Queue()
+    reader = asyncio.create_task(receive_messages(websocket, messages))
+    agent: ClaudeAgent | None = None
 
     try:
         # Start background initialization task
-        asyncio.create_task(initialize_agent_background(websocket))
+        initializer = asyncio.create_task(initialize_agent_background(outbox))
         logger.info("Background initialization task started")
 
-        # Enter message loop immediately (doesn't wait for init)
+        await asyncio.wait((initializer, reader), return_when=asyncio.FIRST_COMPLETED)
+        if not initializer.done():
+            logger.info("Client disconnected during initialization")
+            initializer.cancel()
+            return
+        agent = initializer.result()
+        if agent is not None:
+            active_agents.add(agent)
+
         while True:
+            data_raw = await messages.get()
+            if data_raw is None:
+                # Client disconnected
+                break
+
             try:
-                data_raw = await websocket.receive_text()
-
-                # If initialization not complete, queue the message
-                if not initialization_complete.is_set():
-                    logger.info(
-                        f"Message received before init complete, queueing: {data_raw}"
-                    )
-                    pending_messages.append(data_raw)
-                    continue
-
-                # Process message now that init is complete
-                if data_raw.startswith("{"):
-                    data_json = json.loads(data_raw)
-                    if data_json.get("type") == "button_click":
-                        # Handle button click callback
-                        callback_id = data_json.get("callback_id")
-                        logger.info(f"Button callback received: {callback_id}")
-                        if agent:
-                            response = agent.process_message(
-                                f"button_click:{callback_id}"
-                            )
-                            ui_state = agent.get_ui_state()
-
-                            message: dict[str, Any] = {
-                                "type": "response",
-                                "message": response,
-                                "ui_state": ui_state,
-                            }
-                            await websocket.send_json(message)
-                    else:
-                        # Unknown JSON message type
-                        logger.warning(f"Unknown message type: {data_json.get('type')}")
-                else:
-                    # Regular text message
-                    logger.info(f"Received text: {data_raw}")
-                    if agent:
-                        response = agent.process_message(data_raw)
-                        ui_state = agent.get_ui_state()
-
-                        response_msg: dict[str, Any] = {
-                            "type": "response",
-                            "message": response,
-                            "ui_state": ui_state,
-                        }
-                        await websocket.send_json(response_msg)
+                await handle_message(outbox, agent, data_raw)
             except Exception as e:
-                logger.error(f"Error processing message: {e}")
-                error_msg: dict[str, Any] = {
-                    "type": "error",
-                    "message": f"Error processing message: {e}",
-                }
-                await websocket.send_json(error_msg)
+                logger.error("Error processing message: %s", e)
+                queue_error(outbox, f"Error processing message: {e}")
     except ValueError as e:
-        logger.error(f"Configuration error: {e}")
-        error_msg_value_error: dict[str, Any] = {"type": "error", "message": str(e)}
-        await websocket.send_json(error_msg_value_error)
+        logger.error("Configuration error: %s", e)
+        queue_error(outbox, str(e))
     except Exception as e:
-        logger.error(f"WebSocket error: {e}")
-        error_msg_generic: dict[str, Any] = {
-            "type": "error",
-            "message": f"{type(e).__name__}: {e}",
-        }
-        await websocket.send_json(error_msg_generic)
+        logger.error("WebSocket error: %s", e)
+        queue_error(outbox, f"{type(e).__name__}: {e}")
     finally:
+        reader.cancel()
+        # Release the agent before any await, so cleanup can't be skipped
+        if agent is not None:
+            active_agents.discard(agent)
+        # Let frames already queued (e.g. a final error) go out before closing
+        outbox.put_nowait(None)
+        await sender
         logger.info("Client disconnected")
-        agent = None
-        initialization_complete = None
@@ -1,25 +1,31 @@
 """Configuration module for environment variables."""
 
 import os
+from functools import lru_cache
 
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
 
+@lru_cache(maxsize=1)
+def load_env() -> None:
+    """Load environment variables from the .env file, once per process."""
+    load_dotenv()
 
+
+@lru_cache(maxsize=1)
 def get_anthropic_api_key() -> str:
     """Get Anthropic API key from environment.
 
+    The key is read once; a missing key raises again on the next call.
+
     Returns:
         API key string.
 
     Raises:
         ValueError: If ANTHROPIC_API_KEY is not set.
     """
+    load_env()
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
-        raise ValueError(
-            "ANTHROPIC_API_KEY not found in environment. " "Please set it in .env file."
-        )
+        raise ValueError("ANTHROPIC_API_KEY not found in environment. Please set it in .env file.")
     return api_key
@@ -17,6 +17,9 @@ const elements = {
 // Container for dynamically rendered UI elements
 let uiElements = {};
 
+// Local mirror of the server's UI state, kept current by applying ops
+let uiState = { elements: [] };
+
 // Processing state and message queue
 let isProcessing = false;
 let messageQueue = [];
@@ -108,13 +111,17 @@ function handleServerMessage(msg) {
     // Initial auto-initialization message with LLM response
     addMessage("You", "Create a calculator", "sent");
     addMessage("Assistant", msg.message, "received");
-    renderUIState(msg.ui_state);
+    uiState = msg.ui_state;
+    renderUIState(uiState);
     // Clear processing status after init completes
     updateProcessingStatus(false);
   } else if (msg.type === "response") {
-    // Response to button clicks
+    // Response to button clicks, with only the UI changes since the last message
     addMessage("Assistant", msg.message, "received");
-    renderUIState(msg.ui_state);
+    if (msg.ops && msg.ops.length > 0) {
+      applyUIOps(msg.ops);
+      renderUIState(uiState);
+    }
     // Clear processing status and process next queued message
     updateProcessingStatus(false);
     processNextQueuedMessage();
@@ -128,6 +135,24 @@ function handleServerMessage(msg) {
 }
 
 
+/**
+ * Apply UI ops (add, update, clear) from the server to the local UI state
+ */
+function applyUIOps(ops) {
+  ops.forEach((op) => {
+    if (op.op === "add") {
+      uiState.elements.push(op.element);
+    } else if (op.op === "update") {
+      const elem = uiState.elements.find((e) => e.id === op.id);
+      if (elem) {
+        elem.properties = op.properties;
+      }
+    } else if (op.op === "clear") {
+      uiState.elements = [];
+    }
+  });
+}
+
 /**
  * Render UI elements from state
  */
@@ -1,12 +1,39 @@
 """Pytest configuration and fixtures."""
 
+from collections.abc import Iterator
+from unittest.mock import MagicMock, patch
+
 import pytest
 from fastapi.testclient import TestClient
 
-from src.app.main import app
+from src.agent import claude_agent
+from src.agent.claude_agent import clients
+from src.app.main import app, response_cache
 
 
 @pytest.fixture
 def client() -> TestClient:
     """Provide a test client for HTTP requests."""
     return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache() -> None:
+    """Start every test with an empty shared response cache."""
+    response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_anthropic_clients() -> None:
+    """Start every test without shared Anthropic clients, so patches take effect."""
+    clients.clear()
+
+
+@pytest.fixture
+def anthropic_client() -> Iterator[MagicMock]:
+    """Patch the Anthropic SDK for one test and provide the mock client.
+
+    Tests set messages.create.side_effect to the responses they expect.
+    """
+    with patch.object(claude_agent, "Anthropic") as mock_anthropic:
+        yield mock_anthropic.return_value
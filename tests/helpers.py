@@ -0,0 +1,7 @@
+"""Shared helpers for tests."""
+
+from types import SimpleNamespace
+
+# Canned Claude responses, built once; the agent only reads them. Plain namespaces
+# carry just the attributes the agent uses (mocks are kept for call tracking).
+NO_CACHE_USAGE = SimpleNamespace(cache_read_input_tokens=0, cache_creation_input_tokens=0)
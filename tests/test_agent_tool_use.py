@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, patch
 
 from anthropic.types import TextBlock, ToolUseBlock
 
+from src.agent import claude_agent
 from src.agent.claude_agent import ClaudeAgent
 
 
@@ -26,7 +27,7 @@ def test_agent_handles_tool_use() -> None:
     mock_response_final = MagicMock()
     mock_response_final.content = [mock_text_final]
 
-    with patch("src.agent.claude_agent.Anthropic") as mock_anthropic:
+    with patch.object(claude_agent, "Anthropic") as mock_anthropic:
         mock_client = MagicMock()
         mock_anthropic.return_value = mock_client
         # First call returns tool use, second call returns final response
@@ -61,7 +62,7 @@ def test_agent_conversation_history_format_with_tools() -> None:
     mock_response = MagicMock()
     mock_response.content = [mock_tool_use, mock_text]
 
-    with patch("src.agent.claude_agent.Anthropic") as mock_anthropic:
+    with patch.object(claude_agent, "Anthropic") as mock_anthropic:
         mock_client = MagicMock()
         mock_anthropic.return_value = mock_client
         mock_client.messages.create.return_value = mock_response
@@ -92,3 +93,78 @@ def test_agent_conversation_history_format_with_tools() -> None:
         assert "tool_use_id" in tool_result
         assert "content" in tool_result
         assert tool_result["tool_use_id"] == "tool_123"
+
+
+def test_agent_batch_tool_results_preserve_order() -> None:
+    """Test multiple tool calls in one response keep order and dependencies."""
+    container_use = ToolUseBlock(
+        type="tool_use",
+        id="tool_1",
+        name="create_container",
+        input={"id": "container_1", "flex_direction": "row"},
+    )
+    button_use = ToolUseBlock(
+        type="tool_use",
+        id="tool_2",
+        name="create_button",
+        input={"label": "1", "id": "btn_1", "callback_id": "on_1", "parent_id": "container_1"},
+    )
+
+    mock_response_with_tools = MagicMock()
+    mock_response_with_tools.content = [container_use, button_use]
+    mock_response_final = MagicMock()
+    mock_response_final.content = [TextBlock(type="text", text="Done")]
+
+    with patch.object(claude_agent, "Anthropic") as mock_anthropic:
+        mock_client = MagicMock()
+        mock_anthropic.return_value = mock_client
+        mock_client.messages.create.side_effect = [
+            mock_response_with_tools,
+            mock_response_final,
+        ]
+
+        agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
+        agent.process_message("Create UI")
+
+        tool_results = agent.conversation_history[2]["content"]
+        assert [r["tool_use_id"] for r in tool_results] == ["tool_1", "tool_2"]
+
+        button = agent.ui_state.get_element("btn_1")
+        assert button is not None
+        assert button.parent_id == "container_1"
+
+
+def test_agent_streams_text_across_tool_iterations() -> None:
+    """Test streaming yields text deltas and still executes tools."""
+    tool_use = ToolUseBlock(
+        type="tool_use",
+        id="tool_123",
+        name="display_text",
+        input={"content": "Hello", "id": "text_1"},
+    )
+
+    def make_stream(deltas: list[str], content: list[object]) -> MagicMock:
+        final_message = MagicMock()
+        final_message.content = content
+        response_stream = MagicMock()
+        response_stream.text_stream = iter(deltas)
+        response_stream.get_final_message.return_value = final_message
+        stream_manager = MagicMock()
+        stream_manager.__enter__.return_value = response_stream
+        return stream_manager
+
+    with patch.object(claude_agent, "Anthropic") as mock_anthropic:
+        mock_client = MagicMock()
+        mock_anthropic.return_value = mock_client
+        mock_client.messages.stream.side_effect = [
+            make_stream(["Display", "ing"], [TextBlock(type="text", text="Displaying"), tool_use]),
+            make_stream(["All ", "done!"], [TextBlock(type="text", text="All done!")]),
+        ]
+
+        agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
+        deltas = list(agent.process_message_stream("Display hello"))
+
+        assert deltas == ["Display", "ing", "All ", "done!"]
+        mock_client.messages.create.assert_not_called()
+        assert agent.get_ui_state()["elements"][0]["properties"]["content"] == "Hello"
+        assert len(agent.conversation_history) == 4
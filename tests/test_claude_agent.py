@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from src.agent import claude_agent
 from src.agent.claude_agent import ClaudeAgent
 
 
@@ -15,7 +16,7 @@ def mock_anthropic_client() -> MagicMock:
 
 def test_claude_agent_initialization(mock_anthropic_client: MagicMock) -> None:
     """Test ClaudeAgent initialization."""
-    with patch("src.agent.claude_agent.Anthropic", return_value=mock_anthropic_client):
+    with patch.object(claude_agent, "Anthropic", return_value=mock_anthropic_client):
         system_prompt = "Test prompt"
         agent = ClaudeAgent(system_prompt=system_prompt, api_key="test-key")
 
@@ -25,7 +26,7 @@ def test_claude_agent_initialization(mock_anthropic_client: MagicMock) -> None:
 
 def test_claude_agent_welcome_message(mock_anthropic_client: MagicMock) -> None:
     """Test ClaudeAgent sends welcome message."""
-    with patch("src.agent.claude_agent.Anthropic", return_value=mock_anthropic_client):
+    with patch.object(claude_agent, "Anthropic", return_value=mock_anthropic_client):
         agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
         welcome = agent.send_welcome_message()
 
@@ -44,7 +45,7 @@ def test_claude_agent_process_message(mock_anthropic_client: MagicMock) -> None:
     mock_response.content = [mock_text_block]
     mock_anthropic_client.messages.create.return_value = mock_response
 
-    with patch("src.agent.claude_agent.Anthropic", return_value=mock_anthropic_client):
+    with patch.object(claude_agent, "Anthropic", return_value=mock_anthropic_client):
         agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
 
         response = agent.process_message("Hello Claude")
@@ -73,7 +74,7 @@ def test_claude_agent_maintains_context(
 
     mock_anthropic_client.messages.create.side_effect = [response1, response2]
 
-    with patch("src.agent.claude_agent.Anthropic", return_value=mock_anthropic_client):
+    with patch.object(claude_agent, "Anthropic", return_value=mock_anthropic_client):
         agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
 
         agent.process_message("First message")
@@ -83,3 +84,208 @@ def test_claude_agent_maintains_context(
         assert len(agent.conversation_history) == 4
         assert agent.conversation_history[0]["content"] == "First message"
         assert agent.conversation_history[2]["content"] == "Second message"
+
+
+def test_claude_agent_prompt_caching_breakpoints(mock_anthropic_client: MagicMock) -> None:
+    """Test system prompt, tools and latest turn carry cache breakpoints."""
+    from anthropic.types import TextBlock
+
+    mock_response = MagicMock()
+    mock_response.content = [TextBlock(type="text", text="Cached")]
+    mock_anthropic_client.messages.create.return_value = mock_response
+
+    with patch.object(claude_agent, "Anthropic", return_value=mock_anthropic_client):
+        agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
+        agent.process_message("Hello Claude")
+
+        kwargs = mock_anthropic_client.messages.create.call_args.kwargs
+        assert kwargs["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert kwargs["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert kwargs["messages"][-1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+
+        # Breakpoints are added per request, not stored in history
+        assert agent.conversation_history[0]["content"] == "Hello Claude"
+
+
+@pytest.mark.parametrize(
+    ("user_input", "expected"),
+    [
+        ("thanks", True),
+        ("hi there", True),
+        ("Thank you so much!", True),
+        ("  ok.", True),
+        ("Create a calculator", False),
+        ("show me a grid", False),
+        ("button_click:on_5", False),
+        ("2+2", False),
+        ("what is 7 - 4", False),
+        ("clear", False),
+        ("AC", False),
+        ("undo", False),
+        ("seven minus four", False),
+        ("square root of nine", False),
+        ("make the buttons bigger", False),
+        ("add a memory key", False),
+        ("use the pirate theme", False),
+        ("thanks, now add a memory key", False),
+    ],
+)
+def test_is_simple_message(user_input: str, expected: bool) -> None:
+    """Test fast-path classification of user messages."""
+    from src.agent.claude_agent import is_simple_message
+
+    assert is_simple_message(user_input) is expected
+
+
+def test_claude_agent_simple_message_single_round_trip(
+    mock_anthropic_client: MagicMock,
+) -> None:
+    """Test simple messages make one tool-free call to Claude."""
+    from anthropic.types import TextBlock
+
+    mock_response = MagicMock()
+    mock_response.content = [TextBlock(type="text", text="You're welcome")]
+    mock_anthropic_client.messages.create.return_value = mock_response
+
+    with patch.object(claude_agent, "Anthropic", return_value=mock_anthropic_client):
+        agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
+        response = agent.process_message("thanks")
+
+        assert response == "You're welcome"
+        assert mock_anthropic_client.messages.create.call_count == 1
+        kwargs = mock_anthropic_client.messages.create.call_args.kwargs
+        assert kwargs["tool_choice"] == {"type": "none"}
+        assert len(agent.conversation_history) == 2
+
+
+def test_claude_agents_share_anthropic_client(mock_anthropic_client: MagicMock) -> None:
+    """Test agents with the same API key reuse one client and its connection pool."""
+    from src.agent.claude_agent import close_anthropic_clients
+
+    with patch.object(
+        claude_agent, "Anthropic", return_value=mock_anthropic_client
+    ) as mock_anthropic:
+        first = ClaudeAgent(system_prompt="Test", api_key="test-key")
+        second = ClaudeAgent(system_prompt="Test", api_key="test-key")
+
+        assert first.client is second.client
+        assert mock_anthropic.call_count == 1
+
+        close_anthropic_clients()
+        mock_anthropic_client.close.assert_called_once()
+
+
+def test_anthropic_client_created_once_across_threads(mock_anthropic_client: MagicMock) -> None:
+    """Test agents built concurrently in worker threads still share one client."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.agent.claude_agent import get_anthropic_client
+
+    with patch.object(
+        claude_agent, "Anthropic", return_value=mock_anthropic_client
+    ) as mock_anthropic:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            created = list(pool.map(get_anthropic_client, ["test-key"] * 32))
+
+        assert all(client is mock_anthropic_client for client in created)
+        assert mock_anthropic.call_count == 1
+
+
+def test_claude_agent_warm_prompt_cache(mock_anthropic_client: MagicMock) -> None:
+    """Test cache warm-up re-sends the cached prefix without touching history."""
+    with patch.object(claude_agent, "Anthropic", return_value=mock_anthropic_client):
+        agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
+        agent.conversation_history.append({"role": "user", "content": "Create a calculator"})
+        agent.warm_prompt_cache()
+
+        kwargs = mock_anthropic_client.messages.create.call_args.kwargs
+        assert kwargs["max_tokens"] == 1
+        assert kwargs["system"] == agent.system_blocks
+        assert kwargs["messages"][0]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert kwargs["messages"][-1]["content"] == "ping"
+        assert len(agent.conversation_history) == 1
+
+
+def test_claude_agent_warm_prompt_cache_skipped_during_turn(
+    mock_anthropic_client: MagicMock,
+) -> None:
+    """Test no warm-up is sent while a turn may have an unanswered tool_use."""
+    with patch.object(claude_agent, "Anthropic", return_value=mock_anthropic_client):
+        agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
+        agent.in_turn = True
+        agent.warm_prompt_cache()
+
+        mock_anthropic_client.messages.create.assert_not_called()
+
+
+def test_claude_agent_tracks_turn_activity(mock_anthropic_client: MagicMock) -> None:
+    """Test a turn marks the agent busy while it runs and refreshes last_active."""
+    from anthropic.types import TextBlock
+
+    agent_ref: list[ClaudeAgent] = []
+    busy_during_call: list[bool] = []
+
+    def create(**kwargs: object) -> MagicMock:
+        busy_during_call.append(agent_ref[0].in_turn)
+        response = MagicMock()
+        response.content = [TextBlock(type="text", text="Done")]
+        return response
+
+    mock_anthropic_client.messages.create.side_effect = create
+
+    with (
+        patch.object(claude_agent, "Anthropic", return_value=mock_anthropic_client),
+        patch("src.agent.claude_agent.time.monotonic", side_effect=[100.0, 250.0]),
+    ):
+        agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
+        agent_ref.append(agent)
+        assert agent.last_active == 100.0
+        agent.process_message("button_click:on_1")
+
+        assert busy_during_call == [True]
+        assert agent.in_turn is False
+        assert agent.last_active == 250.0
+
+
+def test_claude_agent_trims_history_by_whole_turns(mock_anthropic_client: MagicMock) -> None:
+    """Test long sessions keep the first turn and drop the oldest later turns."""
+    from anthropic.types import TextBlock
+
+    from src.agent.claude_agent import MAX_HISTORY_MESSAGES
+
+    mock_response = MagicMock()
+    mock_response.content = [TextBlock(type="text", text="Updated")]
+    mock_anthropic_client.messages.create.return_value = mock_response
+
+    with patch.object(claude_agent, "Anthropic", return_value=mock_anthropic_client):
+        agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
+        agent.process_message("Create a calculator")
+        for i in range(MAX_HISTORY_MESSAGES):
+            agent.process_message(f"button_click:on_{i}")
+
+        history = agent.conversation_history
+        assert len(history) <= MAX_HISTORY_MESSAGES
+        assert history[0]["content"] == "Create a calculator"
+        assert history[-2]["content"] == f"button_click:on_{MAX_HISTORY_MESSAGES - 1}"
+        roles = [message["role"] for message in history]
+        assert roles == ["user", "assistant"] * (len(history) // 2)
+
+
+def test_claude_agent_stores_text_only_turns_as_strings(
+    mock_anthropic_client: MagicMock,
+) -> None:
+    """Test text-only assistant turns are stored as plain string content."""
+    from anthropic.types import TextBlock
+
+    mock_response = MagicMock()
+    mock_response.content = [TextBlock(type="text", text="Claude's response")]
+    mock_anthropic_client.messages.create.return_value = mock_response
+
+    with patch.object(claude_agent, "Anthropic", return_value=mock_anthropic_client):
+        agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
+        agent.process_message("Create a calculator")
+
+        assert agent.conversation_history[1] == {
+            "role": "assistant",
+            "content": "Claude's response",
+        }
@@ -23,3 +23,27 @@ def test_nonexistent_endpoint(client: TestClient) -> None:
     """Test that nonexistent endpoints return 404."""
     response = client.get("/nonexistent")
     assert response.status_code == 404
+
+
+def test_root_endpoint_revalidates_by_etag(client: TestClient) -> None:
+    """Test a matching If-None-Match gets 304 without a body."""
+    etag = client.get("/").headers["etag"]
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_versioned_client_script_is_immutable(client: TestClient) -> None:
+    """Test the page links a versioned client.js that is served as immutable."""
+    import re
+
+    match = re.search(r'src="(/static/client\.js\?v=\w+)"', client.get("/").text)
+    assert match is not None
+
+    response = client.get(match.group(1))
+    assert response.status_code == 200
+    assert "immutable" in response.headers["cache-control"]
+
+    unversioned = client.get("/static/client.js")
+    assert "cache-control" not in unversioned.headers
@@ -1,11 +1,40 @@
 """Tests for Phase 5 features: layout properties and button callbacks."""
 
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
 
+import pytest
 from anthropic.types import TextBlock, ToolUseBlock
 
 from src.agent.claude_agent import ClaudeAgent
+from src.agent.tool_executor import ToolExecutor
 from src.agent.ui_state import UIState
+from tests.helpers import NO_CACHE_USAGE
+
+CALCULATE_BUTTON_RESPONSE = SimpleNamespace(
+    usage=NO_CACHE_USAGE,
+    content=[
+        ToolUseBlock(
+            type="tool_use",
+            id="tool_123",
+            name="create_button",
+            input={"label": "Calculate", "id": "btn_1", "callback_id": "on_calculate"},
+        ),
+        TextBlock(type="text", text="Button created"),
+    ],
+)
+# Second response should have no tools (to break the agentic loop)
+ALL_DONE_RESPONSE = SimpleNamespace(
+    usage=NO_CACHE_USAGE, content=[TextBlock(type="text", text="All done!")]
+)
+
+
+@pytest.fixture
+def executor_setup() -> tuple[UIState, ToolExecutor]:
+    """Provide a fresh UI state and a tool executor bound to it."""
+    ui_state = UIState()
+    return ui_state, ToolExecutor(ui_state)
 
 
 def test_ui_element_layout_properties() -> None:
@@ -47,13 +76,9 @@ def test_container_creation() -> None:
     assert elem["layout"]["gap"] == "10px"
 
 
-def test_container_tool_execution() -> None:
+def test_container_tool_execution(executor_setup: tuple[UIState, ToolExecutor]) -> None:
     """Test create_container tool execution."""
-    ui_state = UIState()
-
-    from src.agent.tool_executor import ToolExecutor
-
-    executor = ToolExecutor(ui_state)
+    ui_state, executor = executor_setup
     result = executor.execute_tool(
         "create_container",
         {"id": "cont_1", "flex_direction": "column", "gap": "8px"},
@@ -65,13 +90,9 @@ def test_container_tool_execution() -> None:
     assert state["elements"][0]["type"] == "container"
 
 
-def test_button_callback_id_in_tool() -> None:
+def test_button_callback_id_in_tool(executor_setup: tuple[UIState, ToolExecutor]) -> None:
     """Test create_button tool with callback_id."""
-    ui_state = UIState()
-
-    from src.agent.tool_executor import ToolExecutor
-
-    executor = ToolExecutor(ui_state)
+    ui_state, executor = executor_setup
     result = executor.execute_tool(
         "create_button",
         {
@@ -88,13 +109,9 @@ def test_button_callback_id_in_tool() -> None:
     assert elem["properties"]["callback_id"] == "on_submit"
 
 
-def test_text_with_layout_properties() -> None:
+def test_text_with_layout_properties(executor_setup: tuple[UIState, ToolExecutor]) -> None:
     """Test display_text tool creates text element."""
-    ui_state = UIState()
-
-    from src.agent.tool_executor import ToolExecutor
-
-    executor = ToolExecutor(ui_state)
+    ui_state, executor = executor_setup
     result = executor.execute_tool(
         "display_text",
         {
@@ -110,126 +127,100 @@ def test_text_with_layout_properties() -> None:
     assert elem["properties"]["content"] == "Result: 42"
 
 
-def test_agent_tool_use_with_layout() -> None:
+def test_agent_tool_use_with_layout(anthropic_client: MagicMock) -> None:
     """Test agent handles tool use for creating buttons."""
-    mock_tool_use = ToolUseBlock(
-        type="tool_use",
-        id="tool_123",
-        name="create_button",
-        input={
-            "label": "Calculate",
-            "id": "btn_1",
-            "callback_id": "on_calculate",
-        },
-    )
-    mock_text = TextBlock(type="text", text="Button created")
-
-    mock_response_with_tool = MagicMock()
-    mock_response_with_tool.content = [mock_tool_use, mock_text]
-
-    # Second response should have no tools (to break the agentic loop)
-    mock_text_final = TextBlock(type="text", text="All done!")
-    mock_response_final = MagicMock()
-    mock_response_final.content = [mock_text_final]
-
-    with patch("src.agent.claude_agent.Anthropic") as mock_anthropic:
-        mock_client = MagicMock()
-        mock_anthropic.return_value = mock_client
-        mock_client.messages.create.side_effect = [
-            mock_response_with_tool,
-            mock_response_final,
-        ]
+    anthropic_client.messages.create.side_effect = [
+        CALCULATE_BUTTON_RESPONSE,
+        ALL_DONE_RESPONSE,
+    ]
 
-        agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
-        response = agent.process_message("Create a button")
+    agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
+    response = agent.process_message("Create a button")
 
-        # Verify response
-        assert response == "All done!"
+    # Verify response
+    assert response == "All done!"
 
-        # Verify UI state has button
-        ui_state = agent.get_ui_state()
-        assert len(ui_state["elements"]) == 1
-        elem = ui_state["elements"][0]
-        assert elem["type"] == "button"
-        assert elem["properties"]["callback_id"] == "on_calculate"
-
-
-def test_multiple_buttons_with_callbacks() -> None:
-    """Test multiple buttons with different callbacks."""
-    ui_state = UIState()
-
-    from src.agent.tool_executor import ToolExecutor
-
-    executor = ToolExecutor(ui_state)
-
-    # Create multiple buttons
-    executor.execute_tool(
-        "create_button",
-        {"label": "Add", "id": "btn_add", "callback_id": "on_add"},
-    )
-    executor.execute_tool(
-        "create_button",
-        {"label": "Subtract", "id": "btn_sub", "callback_id": "on_subtract"},
-    )
-    executor.execute_tool(
-        "create_button",
-        {"label": "Clear", "id": "btn_clr", "callback_id": "on_clear"},
-    )
-
-    state = ui_state.get_state()
-    assert len(state["elements"]) == 3
-    assert state["elements"][0]["properties"]["callback_id"] == "on_add"
-    assert state["elements"][1]["properties"]["callback_id"] == "on_subtract"
-    assert state["elements"][2]["properties"]["callback_id"] == "on_clear"
-
-
-def test_container_with_row_layout() -> None:
-    """Test container with row flex direction."""
-    ui_state = UIState()
-
-    from src.agent.tool_executor import ToolExecutor
-
-    executor = ToolExecutor(ui_state)
-
-    executor.execute_tool(
-        "create_container",
-        {
-            "id": "button_row",
-            "flex_direction": "row",
-            "justify_content": "center",
-            "gap": "5px",
-        },
-    )
-
-    state = ui_state.get_state()
-    elem = state["elements"][0]
-    assert elem["layout"]["flex_direction"] == "row"
-    assert elem["layout"]["justify_content"] == "center"
-    assert elem["layout"]["gap"] == "5px"
-
-
-def test_container_with_column_layout() -> None:
-    """Test container with column flex direction."""
-    ui_state = UIState()
-
-    from src.agent.tool_executor import ToolExecutor
-
-    executor = ToolExecutor(ui_state)
-
-    executor.execute_tool(
-        "create_container",
-        {
-            "id": "form_column",
-            "flex_direction": "column",
-            "justify_content": "flex-start",
-            "gap": "12px",
-        },
-    )
-
-    state = ui_state.get_state()
-    elem = state["elements"][0]
-    assert elem["layout"]["flex_direction"] == "column"
-    assert elem["layout"]["justify_content"] == "flex-start"
+    # Verify UI state has button
+    ui_state = agent.get_ui_state()
+    assert len(ui_state["elements"]) == 1
+    elem = ui_state["elements"][0]
+    assert elem["type"] == "button"
+    assert elem["properties"]["callback_id"] == "on_calculate"
+
+
+@pytest.mark.parametrize(
+    ("calls", "checks"),
+    [
+        pytest.param(
+            [
+                ("create_button", {"label": "Add", "id": "btn_add", "callback_id": "on_add"}),
+                (
+                    "create_button",
+                    {"label": "Subtract", "id": "btn_sub", "callback_id": "on_subtract"},
+                ),
+                ("create_button", {"label": "Clear", "id": "btn_clr", "callback_id": "on_clear"}),
+            ],
+            [
+                (0, "properties", "callback_id", "on_add"),
+                (1, "properties", "callback_id", "on_subtract"),
+                (2, "properties", "callback_id", "on_clear"),
+            ],
+            id="multiple_buttons_with_callbacks",
+        ),
+        pytest.param(
+            [
+                (
+                    "create_container",
+                    {
+                        "id": "button_row",
+                        "flex_direction": "row",
+                        "justify_content": "center",
+                        "gap": "5px",
+                    },
+                ),
+            ],
+            [
+                (0, "layout", "flex_direction", "row"),
+                (0, "layout", "justify_content", "center"),
+                (0, "layout", "gap", "5px"),
+            ],
+            id="container_with_row_layout",
+        ),
+        pytest.param(
+            [
+                (
+                    "create_container",
+                    {
+                        "id": "form_column",
+                        "flex_direction": "column",
+                        "justify_content": "flex-start",
+                        "gap": "12px",
+                    },
+                ),
+            ],
+            [
+                (0, "layout", "flex_direction", "column"),
+                (0, "layout", "justify_content", "flex-start"),
+            ],
+            id="container_with_column_layout",
+        ),
+    ],
+)
+def test_tool_sequence(
+    executor_setup: tuple[UIState, ToolExecutor],
+    calls: list[tuple[str, dict[str, Any]]],
+    checks: list[tuple[int, str, str, str]],
+) -> None:
+    """Test a batch of tool calls creates one element per call with the expected values."""
+    ui_state, executor = executor_setup
+
+    results = executor.execute_tools(calls)
+    assert all("successfully" in result for result in results)
+
+    elements = ui_state.get_state()["elements"]
+    assert len(elements) == len(calls)
+    for index, section, key, value in checks:
+        assert elements[index][section][key] == value
 
 
 def test_tool_definitions_have_layout_properties() -> None:
@@ -1,11 +1,51 @@
 """Tests for Phase 6: UI elements and state management."""
 
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 from anthropic.types import TextBlock, ToolUseBlock
 
 from src.agent.claude_agent import ClaudeAgent
 from src.agent.ui_state import UIState
+from tests.helpers import NO_CACHE_USAGE
+
+BUTTON_RESPONSE = SimpleNamespace(
+    usage=NO_CACHE_USAGE,
+    content=[
+        ToolUseBlock(
+            type="tool_use",
+            id="tool_123",
+            name="create_button",
+            input={"label": "Click", "id": "btn_1", "callback_id": "on_click"},
+        ),
+        TextBlock(type="text", text="Button created!"),
+    ],
+)
+BUTTON_AND_TEXT_RESPONSE = SimpleNamespace(
+    usage=NO_CACHE_USAGE,
+    content=[
+        ToolUseBlock(
+            type="tool_use",
+            id="tool_1",
+            name="create_button",
+            input={"label": "Click me", "id": "btn_1", "callback_id": "on_click"},
+        ),
+        ToolUseBlock(
+            type="tool_use",
+            id="tool_2",
+            name="display_text",
+            input={"content": "Hello", "id": "text_1"},
+        ),
+        TextBlock(type="text", text="UI created!"),
+    ],
+)
+# Text-only responses end the agentic loop
+DONE_RESPONSE = SimpleNamespace(
+    usage=NO_CACHE_USAGE, content=[TextBlock(type="text", text="Done!")]
+)
+ALL_SET_RESPONSE = SimpleNamespace(
+    usage=NO_CACHE_USAGE, content=[TextBlock(type="text", text="All set!")]
+)
 
 
 class TestUIStateThemeManagement:
@@ -40,9 +80,9 @@ class TestUIStateThemeManagement:
         ui_state = UIState()
         ui_state.add_container("container_1", "column")
         ui_state.add_text("Child", "text_1", parent_id="container_1")
-        state = ui_state.get_state()
-        text_elem = next(e for e in state["elements"] if e["id"] == "text_1")
-        assert text_elem["parent_id"] == "container_1"
+        text_elem = ui_state.get_element("text_1")
+        assert text_elem is not None
+        assert text_elem.parent_id == "container_1"
 
     def test_theme_in_ui_state_output(self) -> None:
         """Test UI state structure without theme."""
@@ -110,81 +150,35 @@ class TestToolExecutorThemeApplication:
 class TestAgentToolUseWithTheme:
     """Tests for agent tool use with UI creation."""
 
-    def test_agent_applies_theme_tool(self) -> None:
+    def test_agent_applies_theme_tool(self, anthropic_client: MagicMock) -> None:
         """Test agent can create buttons via tool."""
-        mock_tool_use = ToolUseBlock(
-            type="tool_use",
-            id="tool_123",
-            name="create_button",
-            input={"label": "Click", "id": "btn_1", "callback_id": "on_click"},
-        )
-        mock_text = TextBlock(type="text", text="Button created!")
-
-        mock_response_with_tool = MagicMock()
-        mock_response_with_tool.content = [mock_tool_use, mock_text]
+        anthropic_client.messages.create.side_effect = [
+            BUTTON_RESPONSE,
+            DONE_RESPONSE,
+        ]
 
-        mock_text_final = TextBlock(type="text", text="Done!")
-        mock_response_final = MagicMock()
-        mock_response_final.content = [mock_text_final]
+        agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
+        response = agent.process_message("Create a button")
 
-        with patch("src.agent.claude_agent.Anthropic") as mock_anthropic:
-            mock_client = MagicMock()
-            mock_anthropic.return_value = mock_client
-            mock_client.messages.create.side_effect = [
-                mock_response_with_tool,
-                mock_response_final,
-            ]
+        assert response == "Done!"
+        ui_state = agent.get_ui_state()
+        assert len(ui_state["elements"]) == 1
+        assert ui_state["elements"][0]["type"] == "button"
 
-            agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
-            response = agent.process_message("Create a button")
-
-            assert response == "Done!"
-            ui_state = agent.get_ui_state()
-            assert len(ui_state["elements"]) == 1
-            assert ui_state["elements"][0]["type"] == "button"
-
-    def test_agent_combines_theme_and_buttons(self) -> None:
+    def test_agent_combines_theme_and_buttons(self, anthropic_client: MagicMock) -> None:
         """Test agent can create multiple UI elements."""
-        mock_button_tool = ToolUseBlock(
-            type="tool_use",
-            id="tool_1",
-            name="create_button",
-            input={
-                "label": "Click me",
-                "id": "btn_1",
-                "callback_id": "on_click",
-            },
-        )
-        mock_text_tool = ToolUseBlock(
-            type="tool_use",
-            id="tool_2",
-            name="display_text",
-            input={"content": "Hello", "id": "text_1"},
-        )
-        mock_text = TextBlock(type="text", text="UI created!")
-
-        mock_response_with_tools = MagicMock()
-        mock_response_with_tools.content = [mock_button_tool, mock_text_tool, mock_text]
-
-        mock_text_final = TextBlock(type="text", text="All set!")
-        mock_response_final = MagicMock()
-        mock_response_final.content = [mock_text_final]
-
-        with patch("src.agent.claude_agent.Anthropic") as mock_anthropic:
-            mock_client = MagicMock()
-            mock_anthropic.return_value = mock_client
-            mock_client.messages.create.side_effect = [
-                mock_response_with_tools,
-                mock_response_final,
-            ]
+        anthropic_client.messages.create.side_effect = [
+            BUTTON_AND_TEXT_RESPONSE,
+            ALL_SET_RESPONSE,
+        ]
 
-            agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
-            response = agent.process_message("Create a calculator")
+        agent = ClaudeAgent(system_prompt="Test", api_key="test-key")
+        response = agent.process_message("Create a calculator")
 
-            assert response == "All set!"
-            ui_state = agent.get_ui_state()
+        assert response == "All set!"
+        ui_state = agent.get_ui_state()
 
-            # Check elements were created
-            assert len(ui_state["elements"]) == 2
-            assert ui_state["elements"][0]["type"] == "button"
-            assert ui_state["elements"][1]["type"] == "text"
+        # Check elements were created
+        assert len(ui_state["elements"]) == 2
+        assert ui_state["elements"][0]["type"] == "button"
+        assert ui_state["elements"][1]["type"] == "text"
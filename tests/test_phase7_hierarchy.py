@@ -4,8 +4,9 @@ from unittest.mock import MagicMock, patch
 
 from anthropic.types import TextBlock, ToolUseBlock
 
+from src.agent import claude_agent
 from src.agent.claude_agent import ClaudeAgent
-from src.agent.tool_executor import ToolExecutor
+from src.agent.tool_executor import MAX_RESULT_LENGTH, ToolExecutor
 from src.agent.ui_state import UIState
 
 
@@ -242,6 +243,38 @@ class TestToolExecutorHierarchy:
 
         assert "Error" in result or "requires" in result
 
+    def test_execute_unknown_tool(self) -> None:
+        """Test executing an unregistered tool returns an error."""
+        ui_state = UIState()
+        executor = ToolExecutor(ui_state)
+
+        result = executor.execute_tool("delete_everything", {"id": "text_1"})
+
+        assert result == "Error: Unknown tool 'delete_everything'"
+        assert ui_state.get_state()["elements"] == []
+
+    def test_execute_tool_validates_required_inputs(self) -> None:
+        """Test required inputs from the tool schemas are checked before dispatch."""
+        ui_state = UIState()
+        executor = ToolExecutor(ui_state)
+
+        result = executor.execute_tool("create_button", {"label": "Submit", "id": "btn_1"})
+
+        assert result == "Error: create_button requires 'label', 'id', and 'callback_id'"
+        assert ui_state.get_state()["elements"] == []
+
+    def test_execute_tool_truncates_long_result(self) -> None:
+        """Test tool results are capped before being sent back to Claude."""
+        ui_state = UIState()
+        executor = ToolExecutor(ui_state)
+
+        element_id = "x" * 5000
+        result = executor.execute_tool("update_element", {"id": element_id, "content": "New"})
+
+        full = f"Error: Element '{element_id}' not found"
+        truncated = len(full) - MAX_RESULT_LENGTH
+        assert result == f"{full[:MAX_RESULT_LENGTH]}... [truncated {truncated} chars]"
+
 
 class TestAgentHierarchicalUI:
     """Tests for agent building hierarchical UI."""
@@ -280,7 +313,7 @@ class TestAgentHierarchicalUI:
         mock_response_final = MagicMock()
         mock_response_final.content = [mock_text_final]
 
-        with patch("src.agent.claude_agent.Anthropic") as mock_anthropic:
+        with patch.object(claude_agent, "Anthropic") as mock_anthropic:
             mock_client = MagicMock()
             mock_anthropic.return_value = mock_client
             mock_client.messages.create.side_effect = [
@@ -338,7 +371,7 @@ class TestAgentHierarchicalUI:
         mock_response_2_final = MagicMock()
         mock_response_2_final.content = [mock_text_final_2]
 
-        with patch("src.agent.claude_agent.Anthropic") as mock_anthropic:
+        with patch.object(claude_agent, "Anthropic") as mock_anthropic:
             mock_client = MagicMock()
             mock_anthropic.return_value = mock_client
             mock_client.messages.create.side_effect = [
@@ -399,7 +432,7 @@ class TestAgentHierarchicalUI:
         mock_response_final = MagicMock()
         mock_response_final.content = [mock_text_final]
 
-        with patch("src.agent.claude_agent.Anthropic") as mock_anthropic:
+        with patch.object(claude_agent, "Anthropic") as mock_anthropic:
             mock_client = MagicMock()
             mock_anthropic.return_value = mock_client
             mock_client.messages.create.side_effect = [
@@ -456,6 +489,102 @@ class TestGetElement:
         assert elem is not None
         assert elem.parent_id == "section"
 
+    def test_get_element_with_duplicate_id_returns_first(self) -> None:
+        """Test reused IDs keep resolving to the first element."""
+        ui_state = UIState()
+        ui_state.add_text("First", "text_1")
+        ui_state.add_text("Second", "text_1")
+
+        elem = ui_state.get_element("text_1")
+        assert elem is not None
+        assert elem.properties["content"] == "First"
+
+    def test_get_element_after_reset(self) -> None:
+        """Test reset clears the ID index."""
+        ui_state = UIState()
+        ui_state.add_text("Text", "text_1")
+        ui_state.reset()
+
+        assert ui_state.get_element("text_1") is None
+
+
+class TestUIStateSnapshot:
+    """Tests for UI state snapshots and change ops."""
+
+    def test_get_state_memoized_until_mutation(self) -> None:
+        """Test get_state returns the cached snapshot until the UI changes."""
+        ui_state = UIState()
+        ui_state.add_text("Text", "text_1")
+
+        first = ui_state.get_state()
+        assert ui_state.get_state() is first
+
+        ui_state.update_element("text_1", content="Updated")
+        updated = ui_state.get_state()
+        assert updated is not first
+        assert updated["elements"][0]["properties"]["content"] == "Updated"
+
+        ui_state.add_button("Go", "btn_1", "on_go")
+        assert len(ui_state.get_state()["elements"]) == 2
+
+        ui_state.reset()
+        assert ui_state.get_state()["elements"] == []
+
+    def test_get_state_json_matches_state(self) -> None:
+        """Test the JSON encoding matches get_state and is memoized."""
+        import json
+
+        ui_state = UIState()
+        ui_state.add_container("section", "column")
+        ui_state.add_text("Text", "text_1", parent_id="section")
+
+        encoded = ui_state.get_state_json()
+        assert json.loads(encoded) == ui_state.get_state()
+        assert ui_state.get_state_json() is encoded
+
+        ui_state.update_element("text_1", content="Updated")
+        assert b"Updated" in ui_state.get_state_json()
+
+    def test_get_state_reuses_element_dicts(self) -> None:
+        """Test unchanged elements keep their serialized dict across snapshots."""
+        ui_state = UIState()
+        ui_state.add_text("Text", "text_1")
+        ui_state.add_button("Go", "btn_1", "on_go")
+
+        first = ui_state.get_state()["elements"]
+        ui_state.update_element("text_1", content="Updated")
+        second = ui_state.get_state()["elements"]
+
+        assert second is not first
+        assert second[0] is first[0]
+        assert second[1] is first[1]
+        assert second[0]["properties"]["content"] == "Updated"
+
+    def test_drain_ops_returns_changes_since_last_drain(self) -> None:
+        """Test drain_ops returns each change once, oldest first."""
+        ui_state = UIState()
+        ui_state.add_text("0", "display")
+        assert [op["op"] for op in ui_state.drain_ops()] == ["add"]
+
+        ui_state.update_element("display", content="7")
+        ui_state.add_button("C", "btn_c", "on_clear")
+        ops = ui_state.drain_ops()
+
+        assert [op["op"] for op in ops] == ["update", "add"]
+        assert ops[0] == {"op": "update", "id": "display", "properties": {"content": "7"}}
+        assert ops[1]["element"]["id"] == "btn_c"
+        assert ui_state.drain_ops() == []
+
+    def test_drain_ops_after_reset_starts_with_clear(self) -> None:
+        """Test reset discards pending ops and emits a single clear."""
+        ui_state = UIState()
+        ui_state.add_text("Text", "text_1")
+        ui_state.reset()
+        ui_state.add_text("Again", "text_2")
+
+        ops = ui_state.drain_ops()
+        assert [op["op"] for op in ops] == ["clear", "add"]
+
 
 class TestGridLayout:
     """Tests for CSS Grid layout support."""
@@ -572,3 +701,19 @@ class TestGridLayout:
         assert "cols" in container["layout"]
         # flex_direction should not be in grid layout
         assert "flex_direction" not in container["layout"]
+
+    def test_only_containers_have_layout(self) -> None:
+        """Test text and button elements don't carry a layout dict."""
+        ui_state = UIState()
+        ui_state.add_container("section", "column")
+        ui_state.add_text("Text", "text_1", parent_id="section")
+        ui_state.add_button("Go", "btn_1", "on_go", parent_id="section")
+
+        container = ui_state.get_element("section")
+        assert container is not None
+        assert container.layout == {"flex_direction": "column"}
+
+        for element_id in ("text_1", "btn_1"):
+            elem = ui_state.get_element(element_id)
+            assert elem is not None
+            assert elem.layout is None
@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, patch
 
 from anthropic.types import TextBlock, ToolUseBlock
 
+from src.agent import claude_agent
 from src.agent.claude_agent import ClaudeAgent
 
 
@@ -92,7 +93,7 @@ class TestCalculatorNested:
         mock_response_final = MagicMock()
         mock_response_final.content = [TextBlock(type="text", text="Ready")]
 
-        with patch("src.agent.claude_agent.Anthropic") as mock_anthropic:
+        with patch.object(claude_agent, "Anthropic") as mock_anthropic:
             mock_client = MagicMock()
             mock_anthropic.return_value = mock_client
             mock_client.messages.create.side_effect = [mock_response, mock_response_final]
@@ -175,7 +176,7 @@ class TestCalculatorNested:
         mock_response_update_final = MagicMock()
         mock_response_update_final.content = [TextBlock(type="text", text="Done")]
 
-        with patch("src.agent.claude_agent.Anthropic") as mock_anthropic:
+        with patch.object(claude_agent, "Anthropic") as mock_anthropic:
             mock_client = MagicMock()
             mock_anthropic.return_value = mock_client
             mock_client.messages.create.side_effect = [
@@ -310,7 +311,7 @@ class TestCalculatorNested:
         mock_response_final = MagicMock()
         mock_response_final.content = [TextBlock(type="text", text="Done")]
 
-        with patch("src.agent.claude_agent.Anthropic") as mock_anthropic:
+        with patch.object(claude_agent, "Anthropic") as mock_anthropic:
             mock_client = MagicMock()
             mock_anthropic.return_value = mock_client
             mock_client.messages.create.side_effect = [mock_response, mock_response_final]
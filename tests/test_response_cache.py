@@ -0,0 +1,130 @@
+"""Tests for the response cache."""
+
+from unittest.mock import MagicMock, patch
+
+from anthropic.types import TextBlock, ToolUseBlock
+
+from src.agent import claude_agent
+from src.agent.claude_agent import ClaudeAgent
+from src.agent.response_cache import (
+    CachedTurn,
+    ResponseCache,
+    normalize,
+)
+
+
+def test_cache_hit_on_normalized_input() -> None:
+    """Test punctuation, case and spacing variants share a cached turn."""
+    cache = ResponseCache()
+    turn = CachedTurn("Calculator ready")
+    cache.put("Create a calculator", turn)
+
+    assert normalize("  Create a   CALCULATOR!  ") == "create a calculator"
+    assert cache.search("create a calculator.") is turn
+
+
+def test_cache_misses_on_one_word_difference() -> None:
+    """Test inputs that differ by a single meaningful word never share a turn."""
+    cache = ResponseCache()
+    cache.put("make a calculator with a dark background and big round buttons", CachedTurn("a"))
+
+    assert cache.search("make a calculator with a light background and big round buttons") is None
+
+
+def test_cache_lru_eviction() -> None:
+    """Test least recently used entries are evicted when full."""
+    cache = ResponseCache(max_entries=2)
+    cache.put("alpha", CachedTurn("a"))
+    cache.put("beta", CachedTurn("b"))
+    cache.search("alpha")
+    cache.put("gamma", CachedTurn("c"))
+
+    assert cache.search("beta") is None
+    assert cache.search("alpha") is not None
+    assert cache.search("gamma") is not None
+
+
+def test_cache_ttl_expiry() -> None:
+    """Test entries expire after the TTL."""
+    cache = ResponseCache(ttl_seconds=10.0)
+    with patch("src.agent.response_cache.time.monotonic", return_value=100.0):
+        cache.put("alpha", CachedTurn("a"))
+    with patch("src.agent.response_cache.time.monotonic", return_value=111.0):
+        assert cache.search("alpha") is None
+
+
+def test_cache_concurrent_search_and_put() -> None:
+    """Test worker threads can search, expire and store entries at the same time."""
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = ResponseCache(max_entries=16, ttl_seconds=0.0)
+
+    def churn(worker: int) -> None:
+        for i in range(2000):
+            cache.put(f"entry {worker} {i % 20}", CachedTurn("x"))
+            cache.search(f"entry {worker} {i % 7}")
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(churn, range(4)))
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert len(cache.entries) <= 16
+
+
+def test_numeric_inputs_not_cacheable() -> None:
+    """Test inputs with numbers bypass the cache."""
+    assert ResponseCache.is_cacheable("Create a calculator")
+    assert not ResponseCache.is_cacheable("add 2 and 3")
+
+
+def test_agent_replays_cached_opening_turn() -> None:
+    """Test a second session replays the cached turn and its tool calls."""
+    tool_use = ToolUseBlock(
+        type="tool_use",
+        id="tool_1",
+        name="display_text",
+        input={"content": "0", "id": "display"},
+    )
+    response_with_tool = MagicMock()
+    response_with_tool.content = [tool_use]
+    response_final = MagicMock()
+    response_final.content = [TextBlock(type="text", text="Calculator ready")]
+
+    cache = ResponseCache()
+    with patch.object(claude_agent, "Anthropic") as mock_anthropic:
+        mock_client = MagicMock()
+        mock_anthropic.return_value = mock_client
+        mock_client.messages.create.side_effect = [response_with_tool, response_final]
+
+        first = ClaudeAgent(system_prompt="Test", api_key="test-key", response_cache=cache)
+        assert first.process_message("Create a calculator") == "Calculator ready"
+
+        second = ClaudeAgent(system_prompt="Test", api_key="test-key", response_cache=cache)
+        assert second.process_message("Create a calculator") == "Calculator ready"
+
+        assert mock_client.messages.create.call_count == 2
+        assert second.conversation_history == first.conversation_history
+        assert second.get_ui_state() == first.get_ui_state()
+
+
+def test_agent_does_not_cache_later_turns() -> None:
+    """Test turns after the first depend on state and always call Claude."""
+    response = MagicMock()
+    response.content = [TextBlock(type="text", text="Done")]
+
+    cache = ResponseCache()
+    with patch.object(claude_agent, "Anthropic") as mock_anthropic:
+        mock_client = MagicMock()
+        mock_anthropic.return_value = mock_client
+        mock_client.messages.create.return_value = response
+
+        agent = ClaudeAgent(system_prompt="Test", api_key="test-key", response_cache=cache)
+        agent.process_message("Create a calculator")
+        agent.process_message("button_click:on_clear")
+
+        assert list(cache.entries) == ["create a calculator"]
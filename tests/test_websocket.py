@@ -84,7 +84,8 @@ def test_websocket_message_to_claude(client: TestClient) -> None:
 
             assert msg["type"] == "response"
             assert "Button pressed: 5" in msg["message"]
-            assert "ui_state" in msg
+            # Text-only turn: no UI changes to send
+            assert msg["ops"] == []
 
 
 def test_websocket_multiple_messages(client: TestClient) -> None:
@@ -187,3 +188,195 @@ def test_websocket_receives_connected_message_immediately(client: TestClient) ->
             msg = websocket.receive_json()
             assert msg["type"] == "init"
             assert "ui_state" in msg
+
+
+def test_websocket_uses_prebuilt_agent_from_pool(client: TestClient) -> None:
+    """Test a pre-built agent is taken from the pool instead of calling Claude."""
+    import asyncio
+
+    from src.app import main
+
+    with (
+        patch("src.app.main.get_anthropic_api_key", return_value="test-api-key"),
+        patch("src.agent.claude_agent.Anthropic") as mock_anthropic,
+        patch("src.app.main.refill_agent_pool") as mock_refill,
+    ):
+        pooled_agent = main.ClaudeAgent(system_prompt="Test", api_key="test-api-key")
+        pooled_agent.ui_state.add_text("0", "display")
+        pool: asyncio.Queue[tuple[main.ClaudeAgent, str]] = asyncio.Queue(maxsize=1)
+        pool.put_nowait((pooled_agent, "Pre-built calculator"))
+
+        with patch("src.app.main.agent_pool", pool):
+            with client.websocket_connect("/ws") as websocket:
+                assert websocket.receive_json()["type"] == "connected"
+
+                msg = websocket.receive_json()
+                assert msg["type"] == "init"
+                assert msg["message"] == "Pre-built calculator"
+                assert msg["ui_state"]["elements"][0]["id"] == "display"
+
+        mock_anthropic.return_value.messages.create.assert_not_called()
+        mock_refill.assert_called_once()
+
+
+def test_websocket_handles_message_sent_before_init(client: TestClient) -> None:
+    """Test a message sent right after connecting is answered after the init message."""
+    from anthropic.types import TextBlock
+
+    mock_response_init = MagicMock()
+    mock_response_init.content = [TextBlock(type="text", text="Calculator ready")]
+    mock_response_click = MagicMock()
+    mock_response_click.content = [TextBlock(type="text", text="Button pressed: 7")]
+
+    with (
+        patch("src.app.main.get_anthropic_api_key", return_value="test-api-key"),
+        patch("src.agent.claude_agent.Anthropic") as mock_anthropic,
+    ):
+        mock_anthropic_instance = MagicMock()
+        mock_anthropic.return_value = mock_anthropic_instance
+        mock_anthropic_instance.messages.create.side_effect = [
+            mock_response_init,
+            mock_response_click,
+        ]
+
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_json({"type": "button_click", "callback_id": "on_7"})
+
+            assert websocket.receive_json()["type"] == "connected"
+            assert websocket.receive_json()["type"] == "init"
+
+            msg = websocket.receive_json()
+            assert msg["type"] == "response"
+            assert "Button pressed: 7" in msg["message"]
+
+
+def test_websocket_accepts_binary_json_frames(client: TestClient) -> None:
+    """Test a button click sent as a binary frame is handled like a text frame."""
+    import orjson
+    from anthropic.types import TextBlock
+
+    mock_response_init = MagicMock()
+    mock_response_init.content = [TextBlock(type="text", text="Calculator ready")]
+    mock_response_click = MagicMock()
+    mock_response_click.content = [TextBlock(type="text", text="Button pressed: 3")]
+
+    with (
+        patch("src.app.main.get_anthropic_api_key", return_value="test-api-key"),
+        patch("src.agent.claude_agent.Anthropic") as mock_anthropic,
+    ):
+        mock_anthropic_instance = MagicMock()
+        mock_anthropic.return_value = mock_anthropic_instance
+        mock_anthropic_instance.messages.create.side_effect = [
+            mock_response_init,
+            mock_response_click,
+        ]
+
+        with client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+            websocket.receive_json()
+
+            websocket.send_bytes(orjson.dumps({"type": "button_click", "callback_id": "on_3"}))
+            msg = websocket.receive_json()
+            assert msg["type"] == "response"
+            assert "Button pressed: 3" in msg["message"]
+
+        call = mock_anthropic_instance.messages.create.call_args_list[1]
+        user_message = call.kwargs["messages"][-1]
+        assert user_message["content"][0]["text"] == "button_click:on_3"
+
+
+def test_websocket_concurrent_clients_have_separate_agents(client: TestClient) -> None:
+    """Test two open connections each get their own agent, released on disconnect."""
+    from anthropic.types import TextBlock
+
+    from src.app import main
+
+    mock_response = MagicMock()
+    mock_response.content = [TextBlock(type="text", text="Calculator ready")]
+
+    with (
+        patch("src.app.main.get_anthropic_api_key", return_value="test-api-key"),
+        patch("src.agent.claude_agent.Anthropic") as mock_anthropic,
+    ):
+        mock_anthropic.return_value.messages.create.return_value = mock_response
+
+        with client.websocket_connect("/ws") as first, client.websocket_connect("/ws") as second:
+            for websocket in (first, second):
+                assert websocket.receive_json()["type"] == "connected"
+                assert websocket.receive_json()["type"] == "init"
+
+            assert len(main.active_agents) == 2
+
+    assert not main.active_agents
+
+
+def test_startup_does_not_prebuild_agents() -> None:
+    """Test the agent pool is not filled until a client connects."""
+    from src.app.main import app
+
+    with (
+        patch("src.app.main.get_anthropic_api_key", return_value="test-api-key"),
+        patch("src.agent.claude_agent.Anthropic") as mock_anthropic,
+    ):
+        with TestClient(app):
+            pass
+
+        mock_anthropic.return_value.messages.create.assert_not_called()
+
+
+def test_llm_slot_held_until_cancelled_call_finishes() -> None:
+    """Test cancelling a caller keeps its slot until the worker thread returns."""
+    import asyncio
+    import threading
+
+    from src.app import main
+
+    release = threading.Event()
+
+    async def scenario() -> None:
+        with patch("src.app.main.llm_slots", asyncio.Semaphore(1)) as slots:
+            caller = asyncio.create_task(main.run_llm_call(release.wait))
+            try:
+                await asyncio.sleep(0.05)
+                caller.cancel()
+                await asyncio.sleep(0.05)
+                assert caller.cancelled()
+                assert slots.locked()
+            finally:
+                release.set()
+
+            await asyncio.wait_for(slots.acquire(), timeout=5)
+
+    asyncio.run(scenario())
+
+
+def test_prompt_cache_warmer_skips_busy_and_idle_agents() -> None:
+    """Test the warmer refreshes recent active and pooled agents only."""
+    import asyncio
+    import time
+
+    from src.app import main
+
+    now = time.monotonic()
+    recent = MagicMock(in_turn=False, last_active=now)
+    busy = MagicMock(in_turn=True, last_active=now)
+    idle = MagicMock(in_turn=False, last_active=now - main.PROMPT_CACHE_MAX_IDLE - 1)
+    pooled = MagicMock(in_turn=False, last_active=now)
+
+    async def scenario() -> None:
+        warmer = asyncio.create_task(main.keep_prompt_cache_warm())
+        await asyncio.sleep(0.1)
+        warmer.cancel()
+
+    with (
+        patch("src.app.main.PROMPT_CACHE_WARM_INTERVAL", 0.01),
+        patch("src.app.main.llm_slots", asyncio.Semaphore(1)),
+        patch("src.app.main.active_agents", {recent, busy, idle}),
+        patch("src.app.main.pooled_agents", {pooled}),
+    ):
+        asyncio.run(scenario())
+
+    recent.warm_prompt_cache.assert_called()
+    pooled.warm_prompt_cache.assert_called()
+    busy.warm_prompt_cache.assert_not_called()
+    idle.warm_prompt_cache.assert_not_called()